@@ -0,0 +1,60 @@
+"""Store money as integer cents
+
+Revision ID: 5e0b7d2c41a9
+Revises: d41f3c9a8e27
+Create Date: 2026-10-19 09:14:52.630517
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0b7d2c41a9"
+down_revision: Union[str, Sequence[str], None] = "d41f3c9a8e27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, precision of the decimal type being replaced)
+MONEY_COLUMNS = (
+    ("transaction", "amount", 10),
+    ("category", "budget", 10),
+    ("monthly_spend", "amount_spent", 14),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    for table, column, _ in MONEY_COLUMNS:
+        if is_postgres:
+            op.alter_column(
+                table,
+                column,
+                type_=sa.BigInteger(),
+                postgresql_using=f"round({column} * 100)::bigint",
+            )
+        else:
+            # SQLite columns take any type; numeric affinity keeps integers exact
+            op.execute(
+                f'UPDATE "{table}" SET {column} = CAST(round({column} * 100) AS INTEGER)'
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    for table, column, precision in MONEY_COLUMNS:
+        if is_postgres:
+            op.alter_column(
+                table,
+                column,
+                type_=sa.Numeric(precision=precision, scale=2),
+                postgresql_using=f"{column} / 100.0",
+            )
+        else:
+            op.execute(f'UPDATE "{table}" SET {column} = {column} / 100.0')
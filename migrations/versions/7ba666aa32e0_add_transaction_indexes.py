@@ -0,0 +1,50 @@
+"""Add transaction indexes
+
+Revision ID: 7ba666aa32e0
+Revises: 9eb56a105572
+Create Date: 2026-10-18 20:04:37.581902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7ba666aa32e0"
+down_revision: Union[str, Sequence[str], None] = "9eb56a105572"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    # listing sort; its leading column also serves date range filters and reports
+    "ix_transaction_listing_sort": ["trans_date", "vendor", "amount", "id"],
+    # report grouping and the category foreign key action
+    "ix_transaction_category_id": ["category_id"],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # build indexes without blocking writes to the live table
+    with op.get_context().autocommit_block():
+        for index_name, columns in INDEXES.items():
+            op.create_index(
+                index_name,
+                "transaction",
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for index_name in INDEXES:
+            op.drop_index(
+                index_name,
+                table_name="transaction",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
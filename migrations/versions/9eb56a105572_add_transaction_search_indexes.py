@@ -0,0 +1,91 @@
+"""Add transaction search indexes
+
+Revision ID: 9eb56a105572
+Revises: 39ea7adff076
+Create Date: 2026-10-18 19:52:10.214733
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9eb56a105572"
+down_revision: Union[str, Sequence[str], None] = "39ea7adff076"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transaction_search USING fts5(
+        vendor, note, content='transaction', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_search_ai AFTER INSERT ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(rowid, vendor, note)
+        VALUES (new.id, new.vendor, new.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_search_ad AFTER DELETE ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(transaction_search, rowid, vendor, note)
+        VALUES ('delete', old.id, old.vendor, old.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_search_au AFTER UPDATE ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(transaction_search, rowid, vendor, note)
+        VALUES ('delete', old.id, old.vendor, old.note);
+        INSERT INTO transaction_search(rowid, vendor, note)
+        VALUES (new.id, new.vendor, new.note);
+    END
+    """,
+    "INSERT INTO transaction_search(transaction_search) VALUES ('rebuild')",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect_name = op.get_bind().dialect.name
+
+    if dialect_name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        # build indexes without blocking writes to the live table
+        with op.get_context().autocommit_block():
+            for column in ("vendor", "note"):
+                op.create_index(
+                    f"ix_transaction_{column}_trgm",
+                    "transaction",
+                    [column],
+                    postgresql_using="gin",
+                    postgresql_ops={column: "gin_trgm_ops"},
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+    elif dialect_name == "sqlite":
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect_name = op.get_bind().dialect.name
+
+    if dialect_name == "postgresql":
+        with op.get_context().autocommit_block():
+            for column in ("vendor", "note"):
+                op.drop_index(
+                    f"ix_transaction_{column}_trgm",
+                    table_name="transaction",
+                    postgresql_concurrently=True,
+                    if_exists=True,
+                )
+    elif dialect_name == "sqlite":
+        for trigger in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS transaction_search_{trigger}")
+        op.execute("DROP TABLE IF EXISTS transaction_search")
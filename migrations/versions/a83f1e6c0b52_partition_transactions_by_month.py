@@ -0,0 +1,128 @@
+"""Partition transactions by month
+
+Revision ID: a83f1e6c0b52
+Revises: 5e0b7d2c41a9
+Create Date: 2026-10-19 14:02:11.408263
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a83f1e6c0b52"
+down_revision: Union[str, Sequence[str], None] = "5e0b7d2c41a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# months past the current one to create up front; the API adds later ones
+MONTHS_AHEAD = 3
+
+INDEXES = {
+    "ix_transaction_listing_sort": ["trans_date", "vendor", "amount", "id"],
+    "ix_transaction_category_id": ["category_id"],
+}
+TRIGRAM_COLUMNS = ("vendor", "note")
+
+# one partition per month, from the earliest row through MONTHS_AHEAD months from now
+CREATE_PARTITIONS_SQL = f"""
+DO $$
+DECLARE
+    partition_start date := coalesce(
+        (SELECT date_trunc('month', min(trans_date))::date FROM transaction_old),
+        date_trunc('month', current_date)::date
+    );
+    last_start date := greatest(
+        (SELECT date_trunc('month', max(trans_date))::date FROM transaction_old),
+        (date_trunc('month', current_date) + interval '{MONTHS_AHEAD} months')::date
+    );
+BEGIN
+    WHILE partition_start <= last_start LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF "transaction" FOR VALUES FROM (%L) TO (%L)',
+            'transaction_y' || to_char(partition_start, 'YYYY')
+                || 'm' || to_char(partition_start, 'MM'),
+            partition_start,
+            (partition_start + interval '1 month')::date
+        );
+        partition_start := (partition_start + interval '1 month')::date;
+    END LOOP;
+END
+$$
+"""
+
+
+def _drop_indexes() -> None:
+    for index_name in INDEXES:
+        op.drop_index(index_name, table_name="transaction", if_exists=True)
+    for column in TRIGRAM_COLUMNS:
+        op.drop_index(
+            f"ix_transaction_{column}_trgm", table_name="transaction", if_exists=True
+        )
+
+
+def _create_indexes() -> None:
+    # on a partitioned table these cascade to every partition, current and future
+    for index_name, columns in INDEXES.items():
+        op.create_index(index_name, "transaction", columns)
+    for column in TRIGRAM_COLUMNS:
+        op.create_index(
+            f"ix_transaction_{column}_trgm",
+            "transaction",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def _replace_transaction_table(partitioned: bool) -> None:
+    """Swap `transaction` for an empty copy, partitioned or not, and move the rows over."""
+    op.execute("ALTER SEQUENCE transaction_id_seq OWNED BY NONE")
+    _drop_indexes()
+    op.execute('ALTER TABLE "transaction" RENAME TO transaction_old')
+    op.execute(
+        "ALTER TABLE transaction_old RENAME CONSTRAINT transaction_pkey TO transaction_old_pkey"
+    )
+
+    partition_clause = " PARTITION BY RANGE (trans_date)" if partitioned else ""
+    op.execute(
+        'CREATE TABLE "transaction" (LIKE transaction_old INCLUDING DEFAULTS)'
+        + partition_clause
+    )
+    # the partition key has to be part of the primary key
+    primary_key = "id, trans_date" if partitioned else "id"
+    op.execute(
+        f'ALTER TABLE "transaction" ADD CONSTRAINT transaction_pkey PRIMARY KEY ({primary_key})'
+    )
+    op.create_foreign_key(
+        "transaction_category_id_fkey",
+        "transaction",
+        "category",
+        ["category_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+    if partitioned:
+        # computed in the database, so `alembic upgrade --sql` can emit it too
+        op.execute(CREATE_PARTITIONS_SQL)
+
+    # indexes are built once after the copy rather than maintained row by row
+    op.execute('INSERT INTO "transaction" SELECT * FROM transaction_old')
+    op.execute("DROP TABLE transaction_old")
+    op.execute('ALTER SEQUENCE transaction_id_seq OWNED BY "transaction".id')
+    _create_indexes()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite has no table partitioning; the table stays as it is
+    if op.get_bind().dialect.name == "postgresql":
+        _replace_transaction_table(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        _replace_transaction_table(partitioned=False)
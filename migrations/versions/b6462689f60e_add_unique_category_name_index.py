@@ -0,0 +1,43 @@
+"""Add unique category name index
+
+Revision ID: b6462689f60e
+Revises: 7ba666aa32e0
+Create Date: 2026-10-18 21:12:08.413276
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b6462689f60e"
+down_revision: Union[str, Sequence[str], None] = "7ba666aa32e0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # fails if names differing only by case already exist; merge those first
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_category_name_lower",
+            "category",
+            [sa.text("lower(name)")],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_category_name_lower",
+            table_name="category",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,34 @@
+"""Add compacted month
+
+Revision ID: c7d2e94a1f60
+Revises: a83f1e6c0b52
+Create Date: 2026-10-19 16:27:45.902114
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e94a1f60"
+down_revision: Union[str, Sequence[str], None] = "a83f1e6c0b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "compacted_month",
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("compacted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("month"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("compacted_month")
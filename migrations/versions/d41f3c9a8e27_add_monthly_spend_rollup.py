@@ -0,0 +1,57 @@
+"""Add monthly spend rollup
+
+Revision ID: d41f3c9a8e27
+Revises: b6462689f60e
+Create Date: 2026-10-18 22:40:31.118204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d41f3c9a8e27"
+down_revision: Union[str, Sequence[str], None] = "b6462689f60e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "monthly_spend",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=True),
+        sa.Column("amount_spent", sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["category.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_monthly_spend_month_category",
+        "monthly_spend",
+        ["month", sa.text("coalesce(category_id, 0)")],
+        unique=True,
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        month = "date_trunc('month', trans_date)::date"
+    else:
+        month = "date(trans_date, 'start of month')"
+    op.execute(
+        f"""
+        INSERT INTO monthly_spend (month, category_id, amount_spent, transaction_count)
+        SELECT {month}, category_id, coalesce(sum(amount), 0), count(*)
+        FROM "transaction"
+        GROUP BY {month}, category_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_monthly_spend_month_category", table_name="monthly_spend")
+    op.drop_table("monthly_spend")
@@ -0,0 +1,22 @@
+import sys
+
+from sqlmodel import Session
+
+from src.api.dependencies import engine
+from src.api.query_plans import check_query_plans
+
+
+def main():
+    with Session(engine) as session:
+        results = check_query_plans(session)
+
+    for result in results:
+        print(f"[{'OK' if result.passed else 'FAIL'}] {result.name}")
+        if not result.passed:
+            print(result.plan)
+
+    sys.exit(0 if all(result.passed for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+from datetime import date
+from pathlib import Path
+
+from sqlmodel import Session
+
+from src.api.dependencies import engine
+from src.api.retention import (
+    ARCHIVE_DIR,
+    RETENTION_YEARS,
+    compact_transactions,
+    retention_cutoff,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Archive transactions older than the retention horizon to "
+        "Parquet files and purge them, keeping their monthly totals."
+    )
+    parser.add_argument("--years", type=int, default=RETENTION_YEARS)
+    parser.add_argument("--archive-dir", type=Path, default=ARCHIVE_DIR)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cutoff = retention_cutoff(date.today(), args.years)
+
+    with Session(engine) as session:
+        results = compact_transactions(session, cutoff, args.archive_dir)
+
+    for result in results:
+        print(
+            f"{result.month:%Y-%m}: archived {result.archived_count} transactions "
+            f"to {result.archive_path}, purged {result.purged_count}"
+        )
+    print(f"Compacted {len(results)} months before {cutoff}")
+
+
+if __name__ == "__main__":
+    main()
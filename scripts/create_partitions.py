@@ -0,0 +1,18 @@
+from sqlmodel import Session
+
+from src.api.dependencies import engine
+from src.api.partitions import ensure_future_partitions
+
+
+def main():
+    with Session(engine) as session:
+        created = ensure_future_partitions(session)
+
+    if created:
+        print(f"Created transaction partitions: {', '.join(created)}")
+    else:
+        print("No transaction partitions to create")
+
+
+if __name__ == "__main__":
+    main()
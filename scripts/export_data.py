@@ -0,0 +1,74 @@
+import argparse
+from datetime import date
+from pathlib import Path
+
+from sqlmodel import Session, select
+
+from src.api.dependencies import engine
+from src.api.exporters import (
+    CATEGORY_SCHEMA,
+    MONTHLY_SUMMARY_SCHEMA,
+    TRANSACTION_SCHEMA,
+    ColumnarFormat,
+    stream_columnar,
+)
+from src.api.helpers import get_month_range
+from src.api.models import Category, Transaction, TransactionQueryParams
+from src.api.queries import (
+    filter_transactions,
+    monthly_report_query,
+    transaction_rows_query,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Export transactions, categories, or a monthly report as "
+        "Parquet or an Arrow IPC stream."
+    )
+    parser.add_argument(
+        "table", choices=["transactions", "categories", "monthly_budget"]
+    )
+    parser.add_argument(
+        "path", type=Path, help="output file ending in .parquet or .arrow"
+    )
+    parser.add_argument("--start-date", type=date.fromisoformat)
+    parser.add_argument("--end-date", type=date.fromisoformat)
+    parser.add_argument("--year-month", help="month of the report, as YYYY-MM")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    export_format = ColumnarFormat(args.path.suffix.removeprefix(".").lower())
+    session = Session(engine)
+
+    if args.table == "transactions":
+        query_params = TransactionQueryParams(
+            start_date=args.start_date, end_date=args.end_date
+        )
+        query, _ = filter_transactions(
+            transaction_rows_query(), query_params, engine.dialect.name
+        )
+        query = query.order_by(Transaction.id)
+        schema = TRANSACTION_SCHEMA
+    elif args.table == "categories":
+        query = select(Category.id, Category.name, Category.budget).order_by(
+            Category.id
+        )
+        schema = CATEGORY_SCHEMA
+    else:
+        if args.year_month is None:
+            raise SystemExit("--year-month is required for the monthly report")
+        query = monthly_report_query(get_month_range(args.year_month))
+        schema = MONTHLY_SUMMARY_SCHEMA
+
+    # the stream closes the session once written
+    with open(args.path, "wb") as f:
+        f.writelines(stream_columnar(session, query, schema, export_format))
+
+    print(f"Wrote {args.table} to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from faker import Faker
 from sqlmodel import Session, create_engine
 
 from src.api.models import Category, SQLModel, Transaction
+from src.api.rollup import rebuild_monthly_spend
 
 fake = Faker()
 random.seed(42)
@@ -82,6 +83,9 @@ def generate_data(engine):
             session.add(t)
         session.commit()
 
+        rebuild_monthly_spend(session)
+        session.commit()
+
         print(
             f"Generated {len(categories)} categories and {len(transactions)} transactions"
         )
@@ -0,0 +1,76 @@
+import argparse
+import gzip
+from pathlib import Path
+
+from sqlmodel import Session
+
+from src.api.dependencies import engine
+from src.api.importers import (
+    ImportOptions,
+    ImportResult,
+    StatementFormat,
+    import_statement,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Import a CSV, OFX, or QIF bank statement (optionally gzipped)."
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=[f.value for f in StatementFormat])
+    parser.add_argument("--date-column", default="date")
+    parser.add_argument("--amount-column", default="amount")
+    parser.add_argument("--vendor-column", default="vendor")
+    parser.add_argument("--note-column", default="note")
+    parser.add_argument("--date-format", help="strptime format, e.g. %%m/%%d/%%Y")
+    parser.add_argument("--negate-amounts", action="store_true")
+    parser.add_argument("--category-id", type=int)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    return parser.parse_args()
+
+
+def guess_format(path: Path) -> StatementFormat:
+    suffixes = [s for s in path.suffixes if s != ".gz"]
+    return StatementFormat(suffixes[-1].removeprefix(".").lower())
+
+
+def print_progress(result: ImportResult):
+    print(
+        f"read {result.read_count:,} | inserted {result.inserted_count:,} | "
+        f"rejected {result.rejected_count:,}",
+        end="\r",
+        flush=True,
+    )
+
+
+def main():
+    args = parse_args()
+    options = ImportOptions(
+        format=args.format or guess_format(args.path),
+        date_column=args.date_column,
+        amount_column=args.amount_column,
+        vendor_column=args.vendor_column,
+        note_column=args.note_column,
+        date_format=args.date_format,
+        negate_amounts=args.negate_amounts,
+        category_id=args.category_id,
+        batch_size=args.batch_size,
+    )
+
+    open_ = gzip.open if args.path.suffix == ".gz" else open
+    with (
+        open_(args.path, "rt", encoding="utf-8-sig", errors="replace", newline="") as f,
+        Session(engine) as session,
+    ):
+        result = import_statement(session, f, options, on_progress=print_progress)
+
+    print()
+    for rejection in result.rejected:
+        print(f"rejected record {rejection.record}: {rejection.detail}")
+    if result.rejected_count > len(result.rejected):
+        print(f"... and {result.rejected_count - len(result.rejected):,} more")
+
+
+if __name__ == "__main__":
+    main()
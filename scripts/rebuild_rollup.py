@@ -0,0 +1,16 @@
+from sqlmodel import Session
+
+from src.api.dependencies import engine
+from src.api.rollup import rebuild_monthly_spend
+
+
+def main():
+    with Session(engine) as session:
+        count = rebuild_monthly_spend(session)
+        session.commit()
+
+    print(f"Rebuilt monthly spend rollup with {count} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from collections.abc import Sequence
+from datetime import date
+from enum import StrEnum
+
+from sqlalchemy import ColumnElement, Date, Integer, cast, type_coerce
+from sqlmodel import func, nulls_last, outerjoin, select
+from sqlmodel.sql.expression import Select
+
+from .models import Category, Cents, Transaction
+
+
+class Granularity(StrEnum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
+
+
+class AggregateDimension(StrEnum):
+    CATEGORY = "category"
+    VENDOR = "vendor"
+    PERIOD = "period"
+
+
+class AggregateMetric(StrEnum):
+    SUM = "sum"
+    COUNT = "count"
+    AVG = "avg"
+    MIN = "min"
+    MAX = "max"
+
+
+# SQLite date modifiers that move a date to the start of its bucket
+_SQLITE_BUCKET_MODIFIERS = {
+    Granularity.DAY: (),
+    # ISO weeks start on Monday, as with Postgres `date_trunc('week', ...)`
+    Granularity.WEEK: ("weekday 0", "-6 days"),
+    Granularity.MONTH: ("start of month",),
+    Granularity.YEAR: ("start of year",),
+}
+
+
+def date_bucket(
+    column: ColumnElement, granularity: Granularity, dialect_name: str
+) -> ColumnElement[date]:
+    """First day of the day, week, month, quarter, or year containing `column`."""
+    if dialect_name == "postgresql":
+        return cast(func.date_trunc(granularity.value, column), Date)
+
+    if granularity == Granularity.QUARTER:
+        months_into_quarter = (cast(func.strftime("%m", column), Integer) - 1) % 3
+        return func.date(
+            column,
+            "start of month",
+            func.printf("-%d months", months_into_quarter),
+            type_=Date,
+        )
+
+    return func.date(column, *_SQLITE_BUCKET_MODIFIERS[granularity], type_=Date)
+
+
+def _metric_column(metric: AggregateMetric) -> ColumnElement:
+    if metric == AggregateMetric.COUNT:
+        return func.count()
+    if metric == AggregateMetric.AVG:
+        # an average of cents has fractions, which `Cents` rounds off when loading
+        return type_coerce(func.avg(Transaction.amount), Cents)
+    return getattr(func, metric.value)(Transaction.amount)
+
+
+def aggregate_query(
+    dimensions: Sequence[AggregateDimension],
+    metrics: Sequence[AggregateMetric],
+    granularity: Granularity,
+    dialect_name: str,
+    sort: AggregateMetric | None = None,
+) -> Select:
+    """
+    One `GROUP BY` over transactions, labelled by dimension and metric name.
+    Rows come back ordered by `sort`, largest first, then by their dimensions
+    in the order given.
+    """
+    group_columns: list[ColumnElement] = []
+    for dimension in dict.fromkeys(dimensions):
+        if dimension == AggregateDimension.CATEGORY:
+            group_columns += [
+                Transaction.category_id.label("category_id"),  # ty: ignore[unresolved-attribute]
+                Category.name.label("category_name"),  # ty: ignore[unresolved-attribute]
+            ]
+        elif dimension == AggregateDimension.VENDOR:
+            group_columns.append(Transaction.vendor.label("vendor"))  # ty: ignore[unresolved-attribute]
+        else:
+            group_columns.append(
+                date_bucket(Transaction.trans_date, granularity, dialect_name).label(
+                    "period"
+                )
+            )
+
+    metric_columns = {
+        metric: _metric_column(metric).label(metric.value)
+        for metric in dict.fromkeys(metrics)
+    }
+
+    source = Transaction
+    if AggregateDimension.CATEGORY in dimensions:
+        source = outerjoin(
+            Transaction, Category, Transaction.category_id == Category.id
+        )
+    query = (
+        select(*group_columns, *metric_columns.values())
+        .select_from(source)
+        .group_by(*group_columns)
+    )
+    if sort is not None:
+        query = query.order_by(nulls_last(metric_columns[sort].desc()))
+
+    return query.order_by(*(nulls_last(column) for column in group_columns))
@@ -0,0 +1,126 @@
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import NamedTuple
+
+from decouple import config
+from sqlmodel import Session, select
+
+from .dependencies import primary_session
+from .models import Category
+from .responses import category_payload
+
+COUNT_CACHE_TTL = config("COUNT_CACHE_TTL", default=30, cast=float)
+COUNT_CACHE_MAX_ENTRIES = config("COUNT_CACHE_MAX_ENTRIES", default=1024, cast=int)
+CATEGORY_CACHE_TTL = config("CATEGORY_CACHE_TTL", default=60, cast=float)
+
+
+class CountCache:
+    """
+    Row counts keyed by a normalized filter.
+    Writers call `invalidate()` after committing; entries also expire after `ttl`
+    seconds so counts stay fresh when another worker process does the writing.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[Hashable, tuple[float, int]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+        if entry is not None and now - entry[0] < self.ttl:
+            return entry[1]
+
+        count = compute()
+
+        with self._lock:
+            # drop counts taken while a write was being invalidated
+            if generation == self._generation:
+                if key not in self._entries and len(self._entries) >= self.max_entries:
+                    self._entries.pop(next(iter(self._entries)))
+                self._entries[key] = (now, count)
+
+        return count
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+transaction_counts = CountCache(
+    ttl=COUNT_CACHE_TTL, max_entries=COUNT_CACHE_MAX_ENTRIES
+)
+
+
+class SnapshotCache[T]:
+    """
+    One value loaded as a whole, such as a small table, shared by every request.
+    It is invalidated and expires as `CountCache` entries do.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value: T | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(self, load: Callable[[], T]) -> T:
+        now = time.monotonic()
+        with self._lock:
+            value = self._value
+            loaded_at = self._loaded_at
+            generation = self._generation
+        if value is not None and now - loaded_at < self.ttl:
+            return value
+
+        value = load()
+
+        with self._lock:
+            # drop values loaded while a write was being invalidated
+            if generation == self._generation:
+                self._value = value
+                self._loaded_at = now
+
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._value = None
+
+
+class CategorySnapshot(NamedTuple):
+    categories: tuple[dict, ...]  # `CategoryRead` payloads, ordered by name
+    ids_by_name: dict[str, int]  # keyed by lowercase name, as names are unique
+
+
+def _load_category_snapshot(session: Session) -> CategorySnapshot:
+    categories = session.exec(select(Category).order_by(Category.name)).all()
+    return CategorySnapshot(
+        categories=tuple(category_payload(category) for category in categories),
+        ids_by_name={category.name.lower(): category.id for category in categories},
+    )
+
+
+category_snapshots: SnapshotCache[CategorySnapshot] = SnapshotCache(
+    ttl=CATEGORY_CACHE_TTL
+)
+
+
+def _load_primary_category_snapshot(session: Session) -> CategorySnapshot:
+    with primary_session(session) as primary:
+        return _load_category_snapshot(primary)
+
+
+def get_categories(session: Session) -> CategorySnapshot:
+    return category_snapshots.get_or_load(
+        lambda: _load_primary_category_snapshot(session)
+    )
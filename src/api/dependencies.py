@@ -1,12 +1,83 @@
-from typing import Annotated
+import sqlite3
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Annotated, Any, TypeVar
 
 from decouple import config
-from fastapi import Depends
+from fastapi import Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import URL, Engine, event, make_url
+from sqlalchemy.dialects.sqlite.aiosqlite import AsyncAdapt_aiosqlite_connection
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .pool import get_engine_options
 
 DATABASE_URL = config("DATABASE_URL")
 DEBUG = config("DEBUG", default=False, cast=bool)
-engine = create_engine(DATABASE_URL, echo=DEBUG)
+ASYNC_DATABASE = config("ASYNC_DATABASE", default=False, cast=bool)
+# read-only routes go to the replica, if set, except just after the client wrote
+DATABASE_REPLICA_URL = config("DATABASE_REPLICA_URL", default=None)
+READ_YOUR_WRITES_SECONDS = config("READ_YOUR_WRITES_SECONDS", default=5, cast=float)
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+engine = create_engine(
+    DATABASE_URL, echo=DEBUG, **get_engine_options(make_url(DATABASE_URL))
+)
+replica_engine = (
+    create_engine(
+        DATABASE_REPLICA_URL,
+        echo=DEBUG,
+        **get_engine_options(make_url(DATABASE_REPLICA_URL)),
+    )
+    if DATABASE_REPLICA_URL
+    else None
+)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+T = TypeVar("T")
+
+
+def get_async_url(url: str) -> URL:
+    """Swap the driver of a database URL for its asyncio counterpart."""
+    database_url = make_url(url)
+    return database_url.set(drivername=ASYNC_DRIVERS[database_url.get_backend_name()])
+
+
+async_engine = (
+    create_async_engine(
+        get_async_url(DATABASE_URL),
+        echo=DEBUG,
+        **get_engine_options(get_async_url(DATABASE_URL), is_async=True),
+    )
+    if ASYNC_DATABASE
+    else None
+)
+async_replica_engine = (
+    create_async_engine(
+        get_async_url(DATABASE_REPLICA_URL),
+        echo=DEBUG,
+        **get_engine_options(get_async_url(DATABASE_REPLICA_URL), is_async=True),
+    )
+    if ASYNC_DATABASE and DATABASE_REPLICA_URL
+    else None
+)
+
+
+@event.listens_for(Engine, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite ignores foreign key actions such as `ON DELETE SET NULL` unless asked."""
+    if isinstance(
+        dbapi_connection, (sqlite3.Connection, AsyncAdapt_aiosqlite_connection)
+    ):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
 
 
 def get_session():
@@ -15,3 +86,111 @@ def get_session():
 
 
 SessionDep = Annotated[Session, Depends(get_session)]
+
+
+def pin_reads_to_primary(response: Response) -> None:
+    """Send the client's reads to the primary until the replica has caught up with its write."""
+    if replica_engine is None:
+        return
+    until = time.time() + READ_YOUR_WRITES_SECONDS
+    response.set_cookie(
+        READ_YOUR_WRITES_COOKIE,
+        str(until),
+        max_age=int(READ_YOUR_WRITES_SECONDS) + 1,
+        httponly=True,
+    )
+
+
+def reads_pinned_to_primary(request: Request) -> bool:
+    try:
+        until = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+def get_read_session(request: Request):
+    if replica_engine is None or reads_pinned_to_primary(request):
+        bind = engine
+    else:
+        bind = replica_engine
+    with Session(bind) as session:
+        yield session
+
+
+ReadSessionDep = Annotated[Session, Depends(get_read_session)]
+
+
+def reads_from_replica(session: Session) -> bool:
+    if replica_engine is None:
+        return False
+    replicas = [replica_engine]
+    if async_replica_engine is not None:
+        replicas.append(async_replica_engine.sync_engine)
+    return session.get_bind() in replicas
+
+
+@contextmanager
+def primary_session(session: Session) -> Iterator[Session]:
+    """
+    `session`, or a new session on the primary if `session` reads from the replica.
+    For loading process-wide caches, which must not be filled with lagging data.
+    """
+    if not reads_from_replica(session):
+        yield session
+        return
+
+    # inside `AsyncSession.run_sync` the session runs on the event loop, which
+    # the async primary's connections leave free where the sync engine's would not
+    bind = engine
+    if (
+        async_engine is not None
+        and async_replica_engine is not None
+        and session.get_bind() is async_replica_engine.sync_engine
+    ):
+        bind = async_engine.sync_engine
+    with Session(bind) as primary:
+        yield primary
+
+
+class ThreadedSession:
+    """
+    Give a sync `Session` the `run_sync` interface of `AsyncSession`, so async
+    routes can run the same database code on either engine.
+    """
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+
+async def get_async_session():
+    # attributes stay loaded after commit, since lazy loads cannot run outside `run_sync`
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+async def get_async_read_session(request: Request):
+    if async_replica_engine is None or reads_pinned_to_primary(request):
+        bind = async_engine
+    else:
+        bind = async_replica_engine
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        yield session
+
+
+def get_threaded_session(session: SessionDep):
+    return ThreadedSession(session)
+
+
+def get_threaded_read_session(session: ReadSessionDep):
+    return ThreadedSession(session)
+
+
+get_db = get_async_session if ASYNC_DATABASE else get_threaded_session
+get_read_db = get_async_read_session if ASYNC_DATABASE else get_threaded_read_session
+
+DbDep = Annotated[AsyncSession | ThreadedSession, Depends(get_db)]
+ReadDbDep = Annotated[AsyncSession | ThreadedSession, Depends(get_read_db)]
@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+from collections.abc import Iterator, Sequence
+from enum import StrEnum
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Row, Select
+from sqlmodel import Session
+from sqlmodel.sql.expression import SelectOfScalar
+
+EXPORT_BATCH_SIZE = 5000
+PARQUET_ROW_GROUP_SIZE = 100_000
+EXPORT_COLUMNS = (
+    "id",
+    "trans_date",
+    "amount",
+    "vendor",
+    "note",
+    "category_id",
+    "category_name",
+    "created_at",
+    "updated_at",
+)
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+
+class ColumnarFormat(StrEnum):
+    ARROW = "arrow"
+    PARQUET = "parquet"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+}
+
+# columnar exports name their columns after the query's labels
+MONEY = pa.decimal128(14, 2)
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+TRANSACTION_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("trans_date", pa.date32()),
+        ("amount", MONEY),
+        ("vendor", pa.string()),
+        ("note", pa.string()),
+        ("category_id", pa.int64()),
+        ("category_name", pa.string()),
+        ("created_at", TIMESTAMP),
+        ("updated_at", TIMESTAMP),
+    ]
+)
+CATEGORY_SCHEMA = pa.schema(
+    [("id", pa.int64()), ("name", pa.string()), ("budget", MONEY)]
+)
+MONTHLY_SUMMARY_SCHEMA = pa.schema(
+    [
+        ("category_id", pa.int64()),
+        ("category_name", pa.string()),
+        ("amount_spent", MONEY),
+        ("budget", MONEY),
+    ]
+)
+
+
+def _export_row(row: Row) -> tuple:
+    return (
+        row.id,
+        row.trans_date.isoformat(),
+        str(row.amount),
+        row.vendor,
+        row.note,
+        row.category_id,
+        row.category_name,
+        row.created_at.isoformat(),
+        row.updated_at.isoformat() if row.updated_at else None,
+    )
+
+
+def _format_csv(rows: Sequence[tuple], include_header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _format_ndjson(rows: Sequence[tuple]) -> str:
+    return "".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """A write-only file that hands over what was written since the last `drain`."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _record_batch(rows: Sequence[Row], schema: pa.Schema) -> pa.RecordBatch:
+    """Transpose rows into one typed Arrow array per schema field."""
+    columns = list(zip(*rows))
+    positions = [rows[0]._fields.index(name) for name in schema.names]
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(columns[position], type=field.type)
+            for position, field in zip(positions, schema)
+        ],
+        schema=schema,
+    )
+
+
+def stream_columnar(
+    session: Session,
+    query: Select,
+    schema: pa.Schema,
+    export_format: ColumnarFormat | ExportFormat,
+) -> Iterator[bytes]:
+    """
+    Write query results as a zstd-compressed Arrow IPC stream or Parquet file,
+    one record batch per server-side cursor batch. Parquet buffers batches up to
+    `PARQUET_ROW_GROUP_SIZE` rows per row group.
+    """
+    try:
+        results = session.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        sink = _ChunkSink()
+        if export_format == ColumnarFormat.ARROW:
+            writer = pa.ipc.new_stream(
+                sink, schema, options=pa.ipc.IpcWriteOptions(compression="zstd")
+            )
+        else:
+            writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+        pending: list[pa.RecordBatch] = []
+        pending_rows = 0
+        for batch in results.partitions():
+            record_batch = _record_batch(batch, schema)
+            if export_format == ColumnarFormat.ARROW:
+                writer.write_batch(record_batch)
+                yield sink.drain()
+                continue
+
+            pending.append(record_batch)
+            pending_rows += record_batch.num_rows
+            if pending_rows >= PARQUET_ROW_GROUP_SIZE:
+                writer.write_table(pa.Table.from_batches(pending))
+                pending, pending_rows = [], 0
+                yield sink.drain()
+
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending))
+        writer.close()
+        yield sink.drain()
+    finally:
+        session.close()
+
+
+def stream_transactions(
+    session: Session, query: SelectOfScalar, export_format: ExportFormat
+) -> Iterator[str | bytes]:
+    """
+    Serialize query results batch by batch from a server-side cursor.
+    The session is closed once the stream is exhausted or abandoned.
+    """
+    if export_format in (ExportFormat.ARROW, ExportFormat.PARQUET):
+        yield from stream_columnar(session, query, TRANSACTION_SCHEMA, export_format)
+        return
+
+    try:
+        results = session.exec(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        if export_format == ExportFormat.CSV:
+            yield _format_csv([], include_header=True)
+        for batch in results.partitions():
+            rows = [_export_row(row) for row in batch]
+            if export_format == ExportFormat.CSV:
+                yield _format_csv(rows, include_header=False)
+            else:
+                yield _format_ndjson(rows)
+    finally:
+        session.close()
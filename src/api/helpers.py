@@ -1,13 +1,17 @@
+import base64
+import json
 import tomllib
+from collections.abc import Sequence
 from datetime import date, timedelta
 from pathlib import Path
 from typing import NamedTuple
 from urllib.parse import urlencode
 
 from dateutil.relativedelta import relativedelta
-from fastapi import Request
+from fastapi import HTTPException, Request
 from pydantic import HttpUrl, TypeAdapter
-from sqlmodel import Session, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, func, select, text, tuple_
 from sqlmodel.sql.expression import SelectOfScalar
 
 from .models import PageBase, PageLinks, PaginationInput
@@ -51,23 +55,74 @@ def optional_url(url: str | None) -> HttpUrl | None:
         return TypeAdapter(HttpUrl).validate_python(url)
 
 
-def get_query_stats(
-    query: SelectOfScalar, session: Session, pagination_input: PaginationInput
-) -> tuple[int, int]:
-    count_query = select(func.count(1).label("cnt")).select_from(query.subquery())
-    total_row_count = session.exec(count_query).one() or 0
+def count_query_rows(query: SelectOfScalar, session: Session) -> int:
+    """Count rows matched by a query; ordering is dropped since it cannot change the count."""
+    count_query = select(func.count(1).label("cnt")).select_from(
+        query.order_by(None).subquery()
+    )
+    return session.exec(count_query).one() or 0
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    # Postgres drivers report SQLSTATE 23503; SQLite only has the message
+    sqlstate = getattr(error.orig, "pgcode", None) or getattr(
+        error.orig, "sqlstate", None
+    )
+    return sqlstate == "23503" or "FOREIGN KEY constraint failed" in str(error.orig)
+
+
+def estimate_table_rows(session: Session, table_name: str) -> int | None:
+    """
+    Read the planner's row estimate for a whole table from Postgres statistics.
+    A partitioned table is never analyzed itself, so its partitions are summed;
+    those not yet analyzed are new and count as empty.
+    Return None on other databases or when the table has never been analyzed.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+
+    estimate = session.execute(
+        text(
+            """
+            SELECT CASE WHEN parent.relkind = 'p' THEN (
+                SELECT CASE WHEN bool_or(child.reltuples >= 0)
+                    THEN sum(greatest(child.reltuples, 0)) ELSE -1 END
+                FROM pg_inherits
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE pg_inherits.inhparent = parent.oid
+            ) ELSE parent.reltuples END::bigint
+            FROM pg_class parent
+            WHERE parent.oid = to_regclass(:name)
+            """
+        ),
+        {"name": f'"{table_name}"'},
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return None
+
+    return estimate
+
+
+def get_page_count(
+    total_row_count: int | None, pagination_input: PaginationInput
+) -> int | None:
+    if total_row_count is None:
+        return None
 
     total_page_count = (
         total_row_count + pagination_input.size - 1
     ) // pagination_input.size
 
-    return total_row_count, total_page_count
+    return total_page_count
 
 
 def get_page_num_to_return(
-    pagination_input: PaginationInput, total_page_count: int
+    pagination_input: PaginationInput, total_page_count: int | None
 ) -> int:
     """Determine actual page to give; give last page if requested page is out of bounds"""
+    if total_page_count is None:
+        return pagination_input.page
+
     page = min(
         pagination_input.page,
         max(total_page_count, 1),  # give at least page 1 if no records
@@ -78,7 +133,7 @@ def get_page_num_to_return(
 
 def generate_links(
     current_page: int,
-    total_page_count: int,
+    has_next: bool,
     request: Request,
     query_map: dict,
 ) -> PageLinks:
@@ -92,7 +147,7 @@ def generate_links(
     else:
         prev = None
 
-    if current_page < total_page_count:
+    if has_next:
         query_map.update(dict(page=current_page + 1))
         next_ = f"{base_url}?{generate_url_query(query_map)}"
     else:
@@ -111,28 +166,36 @@ def create_page(
     pagination_input: PaginationInput,
     session: Session,
     request: Request,
+    total_row_count: int | None = None,
 ) -> PageBase:
-    """Paginate a SQLModel query and return the results along with pagination links."""
-
-    total_row_count, total_page_count = get_query_stats(
-        query, session, pagination_input
-    )
+    """
+    Paginate a SQLModel query and return the results along with pagination links.
+    Without a `total_row_count`, page counts are omitted and one extra row is
+    fetched to decide whether a next page exists.
+    """
+    total_page_count = get_page_count(total_row_count, pagination_input)
     page = get_page_num_to_return(pagination_input, total_page_count)
 
+    # get paginated data
+    size = pagination_input.size
+    offset = (page - 1) * size
+    if total_page_count is None:
+        data = list(session.exec(query.offset(offset).limit(size + 1)).all())
+        has_next = len(data) > size
+        data = data[:size]
+    else:
+        data = session.exec(query.offset(offset).limit(size)).all()
+        has_next = page < total_page_count
+
     # build links
-    query_map.update(dict(page=page, size=pagination_input.size))
+    query_map.update(dict(page=page, size=size))
     links = generate_links(
         current_page=page,
-        total_page_count=total_page_count,
+        has_next=has_next,
         request=request,
         query_map=query_map,
     )
 
-    # get paginated data
-    offset = (page - 1) * pagination_input.size
-    query = query.offset(offset).limit(pagination_input.size)
-    data = session.exec(query).all()
-
     page_output = PageBase(
         data=data,
         total_row_count=total_row_count,
@@ -143,6 +206,131 @@ def create_page(
     return page_output
 
 
+def encode_cursor(values: Sequence, backward: bool = False) -> str:
+    """Pack the sort key of a boundary row into an opaque, URL-safe cursor."""
+    # raw UTF-8 rather than \uXXXX escapes keeps non-Latin vendors within CURSOR_MAX_LENGTH
+    payload = json.dumps(
+        [backward, *values], default=str, separators=(",", ":"), ensure_ascii=False
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _field_annotation(column) -> type:
+    """Look up the model field type behind a SQLModel column attribute."""
+    return column.class_.model_fields[column.key].annotation
+
+
+def decode_cursor(cursor: str, sort_columns: Sequence) -> tuple[bool, list]:
+    """Unpack a cursor into its direction and sort key, typed like `sort_columns`."""
+    try:
+        backward, *raw_values = json.loads(base64.urlsafe_b64decode(cursor))
+        if not isinstance(backward, bool) or len(raw_values) != len(sort_columns):
+            raise ValueError("Cursor does not match sort columns")
+        values = [
+            TypeAdapter(_field_annotation(column)).validate_python(value)
+            for column, value in zip(sort_columns, raw_values)
+        ]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return backward, values
+
+
+def generate_keyset_links(
+    request: Request,
+    query_map: dict,
+    prev_cursor: str | None,
+    next_cursor: str | None,
+) -> PageLinks:
+    base_url = request.url_for("read_transactions")
+
+    current = f"{base_url}?{generate_url_query(query_map)}"
+
+    if prev_cursor is not None:
+        query_map.update(dict(cursor=prev_cursor))
+        prev = f"{base_url}?{generate_url_query(query_map)}"
+    else:
+        prev = None
+
+    if next_cursor is not None:
+        query_map.update(dict(cursor=next_cursor))
+        next_ = f"{base_url}?{generate_url_query(query_map)}"
+    else:
+        next_ = None
+
+    return PageLinks(
+        current=required_url(current),
+        prev=optional_url(prev),
+        next=optional_url(next_),
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
+    )
+
+
+def create_keyset_page(
+    query: SelectOfScalar,
+    sort_columns: Sequence,
+    query_map: dict,
+    pagination_input: PaginationInput,
+    session: Session,
+    request: Request,
+    total_row_count: int | None = None,
+) -> PageBase:
+    """
+    Paginate a SQLModel query by seeking past the row named in the cursor.
+    Rows are sorted descending by `sort_columns`; the last column must be unique.
+    An empty cursor starts at the first page.
+    """
+    size = pagination_input.size
+    cursor = pagination_input.cursor
+
+    # seek past the boundary row instead of counting and skipping earlier rows
+    backward = False
+    if cursor:
+        backward, values = decode_cursor(cursor, sort_columns)
+        sort_key = tuple_(*sort_columns)
+        boundary = tuple_(*values, types=[column.type for column in sort_columns])
+        query = query.where(sort_key > boundary if backward else sort_key < boundary)
+
+    if backward:
+        query = query.order_by(*(column.asc() for column in sort_columns))
+    else:
+        query = query.order_by(*(column.desc() for column in sort_columns))
+
+    # fetch one extra row to learn whether another page follows
+    data = list(session.exec(query.limit(size + 1)).all())
+    has_more = len(data) > size
+    data = data[:size]
+    if backward:
+        data.reverse()
+
+    # a cursor always points at a row on the far side of the page it came from
+    if backward:
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = bool(cursor), has_more
+
+    prev_cursor = next_cursor = None
+    if data and has_prev:
+        first_key = [getattr(data[0], column.key) for column in sort_columns]
+        prev_cursor = encode_cursor(first_key, backward=True)
+    if data and has_next:
+        last_key = [getattr(data[-1], column.key) for column in sort_columns]
+        next_cursor = encode_cursor(last_key)
+
+    query_map.update(dict(cursor=cursor, size=size))
+    links = generate_keyset_links(request, query_map, prev_cursor, next_cursor)
+
+    page_output = PageBase(
+        data=data,
+        total_row_count=total_row_count,
+        total_page_count=get_page_count(total_row_count, pagination_input),
+        links=links,
+    )
+
+    return page_output
+
+
 def validate_year_month(year_month: str) -> str:
     year, month = map(int, year_month.split("-"))
     if year > date.today().year:
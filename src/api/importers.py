@@ -0,0 +1,234 @@
+import csv
+import html
+import re
+from collections.abc import Callable, Iterator
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from enum import StrEnum
+from itertools import batched
+from typing import TextIO
+
+from dateutil import parser as date_parser
+from pydantic import BaseModel, Field, ValidationError
+from sqlmodel import Session
+
+from .cache import transaction_counts
+from .ingest import find_missing_categories, insert_transactions
+from .models import TransactionCreate
+
+MAX_REPORTED_REJECTIONS = 100
+OFX_CHUNK_SIZE = 64 * 1024
+OFX_TAG_PATTERN = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+# keep in step with the field limits on `TransactionBase`
+VENDOR_MAX_LENGTH = 25
+NOTE_MAX_LENGTH = 50
+
+
+class StatementFormat(StrEnum):
+    CSV = "csv"
+    OFX = "ofx"
+    QIF = "qif"
+
+
+class ImportOptions(BaseModel):
+    format: StatementFormat = StatementFormat.CSV
+    date_column: str = "date"
+    amount_column: str = "amount"
+    vendor_column: str = "vendor"
+    note_column: str | None = "note"
+    date_format: str | None = None
+    negate_amounts: bool = False
+    category_id: int | None = None
+    batch_size: int = Field(default=1000, ge=1, le=10_000)
+
+
+class ImportRejection(BaseModel):
+    record: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    read_count: int = 0
+    inserted_count: int = 0
+    rejected_count: int = 0
+    rejected: list[ImportRejection] = []
+
+    def reject(self, record: int, detail: str) -> None:
+        self.rejected_count += 1
+        if len(self.rejected) < MAX_REPORTED_REJECTIONS:
+            self.rejected.append(ImportRejection(record=record, detail=detail))
+
+
+def read_csv_records(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _ofx_tokens(stream: TextIO) -> Iterator[tuple[bool, str, str]]:
+    """Yield (is_closing, tag, value) from SGML or XML OFX, one chunk at a time."""
+    buffer = ""
+    while chunk := stream.read(OFX_CHUNK_SIZE):
+        buffer += chunk
+        # the text after the last '<' may be a tag cut in half by the chunk boundary
+        cut = buffer.rfind("<")
+        for match in OFX_TAG_PATTERN.finditer(buffer, 0, cut):
+            yield match[1] == "/", match[2].upper(), match[3]
+        buffer = buffer[cut:] if cut >= 0 else ""
+
+    for match in OFX_TAG_PATTERN.finditer(buffer):
+        yield match[1] == "/", match[2].upper(), match[3]
+
+
+def read_ofx_records(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    ofx_fields = {"DTPOSTED": "date", "TRNAMT": "amount", "MEMO": "note"}
+    record_num = 0
+    record = None
+
+    for is_closing, tag, value in _ofx_tokens(stream):
+        if tag == "STMTTRN":
+            # SGML files may omit closing tags, so an opening tag also ends a record
+            if record is not None:
+                yield record_num, record
+            record = None
+            if not is_closing:
+                record_num += 1
+                record = {}
+        elif record is not None and not is_closing:
+            value = html.unescape(value.strip())
+            if tag in ofx_fields:
+                record[ofx_fields[tag]] = value
+            elif tag in ("NAME", "PAYEE"):
+                record.setdefault("vendor", value)
+
+    if record is not None:
+        yield record_num, record
+
+
+def read_qif_records(stream: TextIO) -> Iterator[tuple[int, dict]]:
+    qif_fields = {"D": "date", "T": "amount", "P": "vendor", "M": "note"}
+    record_num = 0
+    record = {}
+
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("!"):
+            continue
+        if line == "^":
+            record_num += 1
+            yield record_num, record
+            record = {}
+        elif line[0] in qif_fields:
+            record[qif_fields[line[0]]] = line[1:].strip()
+
+    if record:
+        yield record_num + 1, record
+
+
+def parse_date(value: str, date_format: str | None = None) -> date:
+    if date_format is not None:
+        return datetime.strptime(value, date_format).date()
+    if value[:8].isdigit():
+        return datetime.strptime(value[:8], "%Y%m%d").date()  # OFX timestamps
+    return date_parser.parse(value.replace("'", "/")).date()  # QIF uses 7/14'25
+
+
+def parse_amount(value: str) -> Decimal:
+    value = value.strip().replace("$", "").replace(",", "")
+    if value.startswith("(") and value.endswith(")"):
+        value = f"-{value[1:-1]}"
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{value}'")
+
+
+def to_transaction(raw: dict, options: ImportOptions) -> TransactionCreate:
+    """Map one raw statement record onto `TransactionCreate`; raise ValueError if unusable."""
+    # only CSV headers vary by bank; the other readers emit the default names
+    columns = options if options.format == StatementFormat.CSV else ImportOptions()
+
+    def field(column: str | None) -> str | None:
+        value = raw.get(column) if column is not None else None
+        if value is None or not value.strip():
+            return None
+        return value.strip()
+
+    trans_date = field(columns.date_column)
+    amount = field(columns.amount_column)
+    vendor = field(columns.vendor_column)
+    if trans_date is None or amount is None or vendor is None:
+        raise ValueError("Missing date, amount, or vendor")
+
+    note = field(columns.note_column)
+    amount_value = parse_amount(amount)
+
+    return TransactionCreate(
+        trans_date=parse_date(trans_date, options.date_format),
+        amount=-amount_value if options.negate_amounts else amount_value,
+        vendor=vendor[:VENDOR_MAX_LENGTH],
+        note=note[:NOTE_MAX_LENGTH] if note else None,
+        category_id=options.category_id,
+    )
+
+
+def read_statement(
+    stream: TextIO, options: ImportOptions, result: ImportResult
+) -> Iterator[tuple[int, TransactionCreate]]:
+    """Lazily parse and validate records, recording unusable ones in `result`."""
+    match options.format:
+        case StatementFormat.CSV:
+            records = read_csv_records(stream)
+        case StatementFormat.OFX:
+            records = read_ofx_records(stream)
+        case StatementFormat.QIF:
+            records = read_qif_records(stream)
+
+    for record_num, raw in records:
+        result.read_count += 1
+        try:
+            transaction = to_transaction(raw, options)
+        except ValidationError as e:
+            result.reject(record_num, "; ".join(err["msg"] for err in e.errors()))
+            continue
+        except ValueError as e:
+            result.reject(record_num, str(e))
+            continue
+
+        yield record_num, transaction
+
+
+def import_statement(
+    session: Session,
+    stream: TextIO,
+    options: ImportOptions,
+    on_progress: Callable[[ImportResult], None] | None = None,
+) -> ImportResult:
+    """
+    Stream a statement into the database in batches of `options.batch_size`.
+    Each batch is committed before the next is parsed, so memory use stays flat
+    however large the statement is.
+    """
+    result = ImportResult()
+
+    for batch in batched(read_statement(stream, options, result), options.batch_size):
+        record_nums = [record_num for record_num, _ in batch]
+        transactions = [transaction for _, transaction in batch]
+
+        errors = find_missing_categories(session, transactions)
+        for error in errors:
+            result.reject(record_nums[error.index], error.detail)
+        rejected = {error.index for error in errors}
+
+        result.inserted_count += insert_transactions(
+            session,
+            [t for index, t in enumerate(transactions) if index not in rejected],
+        )
+        session.commit()
+        transaction_counts.invalidate()
+
+        if on_progress is not None:
+            on_progress(result)
+
+    return result
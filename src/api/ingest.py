@@ -0,0 +1,100 @@
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+from sqlalchemy import Row
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, func, insert, select
+
+from .cache import get_categories
+from .ledger import track_ledger_change, transaction_ledger
+from .models import (
+    Category,
+    CategoryCreate,
+    Transaction,
+    TransactionBulkError,
+    TransactionCreate,
+)
+from .partitions import ensure_partitions
+from .rollup import apply_spend_deltas, spend_deltas
+
+
+def find_missing_categories(
+    session: Session, transactions: Sequence[TransactionCreate]
+) -> list[TransactionBulkError]:
+    """Check referenced categories against the cache; report rows whose category is missing."""
+    referenced_ids = {t.category_id for t in transactions if t.category_id is not None}
+    if not referenced_ids:
+        return []
+
+    existing_ids = set(get_categories(session).ids_by_name.values())
+
+    # categories created by another worker may not be cached yet
+    uncached_ids = referenced_ids - existing_ids
+    if uncached_ids:
+        category_query = select(Category.id).where(
+            Category.id.in_(uncached_ids)  # ty: ignore[unresolved-attribute]
+        )
+        existing_ids.update(session.exec(category_query).all())
+
+    return [
+        TransactionBulkError(index=index, detail="Category not found")
+        for index, transaction in enumerate(transactions)
+        if transaction.category_id is not None
+        and transaction.category_id not in existing_ids
+    ]
+
+
+def insert_transactions(
+    session: Session, transactions: Sequence[TransactionCreate]
+) -> int:
+    """
+    Insert validated transactions as batched multi-row INSERT statements.
+    The caller owns the surrounding database transaction and commits it.
+    """
+    if not transactions:
+        return 0
+
+    created_at = datetime.now(timezone.utc)
+    rows = [
+        dict(transaction.model_dump(), created_at=created_at)
+        for transaction in transactions
+    ]
+    ensure_partitions(session, (row["trans_date"] for row in rows))
+    if transaction_ledger.enabled:
+        # the ledger snapshot needs the ids, returned in the order the rows were sent
+        ids = session.scalars(
+            insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        ledger_rows = [dict(row, id=id) for row, id in zip(rows, ids)]
+        track_ledger_change(session, lambda ledger: ledger.upsert(ledger_rows))
+    else:
+        session.execute(insert(Transaction), rows)
+    apply_spend_deltas(session, spend_deltas(added=rows))
+
+    return len(rows)
+
+
+def upsert_categories(
+    session: Session, categories: Sequence[CategoryCreate]
+) -> Sequence[Row]:
+    """
+    Create or update categories by name in one `INSERT ... ON CONFLICT` statement.
+    Names match regardless of case, and the last entry wins when a name repeats.
+    The caller commits.
+    """
+    if not categories:
+        return []
+
+    # a single statement may not update the same row twice
+    rows = {category.name.lower(): category.model_dump() for category in categories}
+
+    dialect_name = session.get_bind().dialect.name
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    statement = dialect.insert(Category).values(list(rows.values()))
+    statement = statement.on_conflict_do_update(
+        index_elements=[func.lower(Category.name)],
+        set_={"name": statement.excluded.name, "budget": statement.excluded.budget},
+    ).returning(Category.id, Category.name, Category.budget)
+
+    return session.execute(statement).all()
@@ -0,0 +1,322 @@
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from datetime import date
+from typing import NamedTuple
+
+import numpy as np
+from decouple import config
+from sqlalchemy import Engine, Integer, cast, event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, func, select
+
+from .models import Transaction, raw_cents
+from .stats import UNCATEGORIZED
+
+LEDGER_SNAPSHOT = config("LEDGER_SNAPSHOT", default=False, cast=bool)
+# other worker processes write too; reload the whole snapshot this often
+LEDGER_SNAPSHOT_TTL = config("LEDGER_SNAPSHOT_TTL", default=300, cast=float)
+LEDGER_LOAD_BATCH_SIZE = 100_000
+
+EPOCH = date(1970, 1, 1)
+_EPOCH_ORDINAL = EPOCH.toordinal()
+
+LedgerChange = Callable[["ColumnarLedger"], None]
+
+
+class LedgerColumns(NamedTuple):
+    """Equal-length arrays, one element per transaction, ordered by id."""
+
+    id: np.ndarray  # int64
+    day: np.ndarray  # int32, days since 1970-01-01
+    amount_cents: np.ndarray  # int64
+    category_id: np.ndarray  # int32, UNCATEGORIZED for NULL
+    vendor_code: np.ndarray  # int32, index into `ColumnarLedger.vendors`
+
+
+_DTYPES = LedgerColumns(
+    id=np.int64,
+    day=np.int32,
+    amount_cents=np.int64,
+    category_id=np.int32,
+    vendor_code=np.int32,
+)
+
+
+def epoch_day(value: date) -> int:
+    return value.toordinal() - _EPOCH_ORDINAL
+
+
+def month_index(days: np.ndarray) -> np.ndarray:
+    """Epoch days as year * 12 + month - 1."""
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return months + EPOCH.year * 12
+
+
+def _ledger_query(dialect_name: str):
+    if dialect_name == "postgresql":
+        day = Transaction.trans_date - EPOCH
+    else:
+        day = func.julianday(Transaction.trans_date) - func.julianday(EPOCH)
+    return select(
+        Transaction.id,
+        cast(day, Integer).label("day"),
+        raw_cents(Transaction.amount).label("amount_cents"),
+        func.coalesce(Transaction.category_id, UNCATEGORIZED).label("category_id"),
+        Transaction.vendor,
+    ).order_by(Transaction.id)
+
+
+class ColumnarLedger:
+    """
+    An in-process, array-backed copy of the `transaction` columns reports scan.
+    Rows are kept in id order in arrays with spare capacity, so appends are
+    amortized; deletes only clear a row's live flag until the next read
+    compacts the arrays. Vendors are dictionary encoded.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.enabled = False
+        self._lock = threading.RLock()
+        self._reload_lock = threading.Lock()
+        self._changes_during_load: list[LedgerChange] | None = None
+        self._bind: Engine | None = None
+        self._clear()
+
+    def _clear(self) -> None:
+        self.vendors: list[str] = []
+        self._vendor_codes: dict[str, int] = {}
+        self._arrays = LedgerColumns(*(np.empty(0, dtype) for dtype in _DTYPES))
+        self._live = np.empty(0, bool)
+        self._size = 0
+        self._dead_count = 0
+        self._loaded_at = 0.0
+
+    def _vendor_code(self, vendor: str) -> int:
+        code = self._vendor_codes.get(vendor)
+        if code is None:
+            code = self._vendor_codes[vendor] = len(self.vendors)
+            self.vendors.append(vendor)
+        return code
+
+    def _compact(self) -> None:
+        # new arrays, so views already handed out by `columns` stay intact
+        live = self._live[: self._size]
+        self._arrays = LedgerColumns(
+            *(array[: self._size][live] for array in self._arrays)
+        )
+        self._size = len(self._arrays.id)
+        self._live = np.ones(self._size, bool)
+        self._dead_count = 0
+
+    def _append(self, columns: LedgerColumns) -> None:
+        count = len(columns.id)
+        end = self._size + count
+        if end > len(self._live):
+            capacity = max(end, len(self._live) * 2, 1024)
+            self._arrays = LedgerColumns(
+                *(np.resize(array, capacity) for array in self._arrays)
+            )
+            self._live = np.resize(self._live, capacity)
+
+        for array, values in zip(self._arrays, columns):
+            array[self._size : end] = values
+        self._live[self._size : end] = True
+
+        # ids from one database sequence arrive in order; re-sort if they do not
+        ids = self._arrays.id[max(self._size - 1, 0) : end]
+        self._size = end
+        if np.any(ids[1:] <= ids[:-1]):
+            order = np.argsort(self._arrays.id[:end], kind="stable")
+            self._arrays = LedgerColumns(
+                *(array[:end][order] for array in self._arrays)
+            )
+            self._live = self._live[:end][order]
+
+    def _positions(self, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Positions of the live rows with the given ids, and which ids were found."""
+        positions = np.searchsorted(self._arrays.id[: self._size], ids)
+        found = positions < self._size
+        found[found] = (self._arrays.id[positions[found]] == ids[found]) & self._live[
+            positions[found]
+        ]
+        return positions[found], found
+
+    def _fill(self, session: Session) -> None:
+        result = session.execute(
+            _ledger_query(session.get_bind().dialect.name).execution_options(
+                yield_per=LEDGER_LOAD_BATCH_SIZE
+            )
+        )
+        for batch in result.partitions():
+            ids, days, amounts, categories, vendors = zip(*batch)
+            self._append(
+                LedgerColumns(
+                    id=np.array(ids, np.int64),
+                    day=np.array(days, np.int32),
+                    amount_cents=np.array(amounts, np.int64),
+                    category_id=np.array(categories, np.int32),
+                    vendor_code=np.array(
+                        [self._vendor_code(vendor) for vendor in vendors], np.int32
+                    ),
+                )
+            )
+
+    def _reload(self, session: Session) -> None:
+        # built without the lock, so reads and writes' changes are not held up;
+        # changes applied meanwhile are replayed onto the new arrays, which is
+        # safe even for those the query already saw
+        with self._lock:
+            self._changes_during_load = []
+        fresh = ColumnarLedger(self.ttl)
+        try:
+            fresh._fill(session)
+        except BaseException:
+            with self._lock:
+                self._changes_during_load = None
+            raise
+
+        with self._lock:
+            for change in self._changes_during_load:
+                change(fresh)
+            self._changes_during_load = None
+            self.vendors, self._vendor_codes = fresh.vendors, fresh._vendor_codes
+            self._arrays, self._live = fresh._arrays, fresh._live
+            self._size, self._dead_count = fresh._size, fresh._dead_count
+            self.enabled = True
+            self._loaded_at = time.monotonic()
+
+    def load(self, session: Session) -> None:
+        """
+        Replace the snapshot with the current contents of `transaction`. Later
+        reloads read from the same database.
+        """
+        with self._reload_lock:
+            self._reload(session)
+            self._bind = session.get_bind()
+
+    def reload_in_background(self) -> threading.Thread | None:
+        """
+        Reload in a new thread unless a reload is already running, so no request
+        waits for the table scan; the current snapshot is served meanwhile.
+        """
+        if self._bind is None or not self._reload_lock.acquire(blocking=False):
+            return None
+        thread = threading.Thread(
+            target=self._reload_and_release, name="ledger-reload", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _reload_and_release(self) -> None:
+        # a failed reload leaves the snapshot expired, so the next read retries
+        try:
+            with Session(self._bind) as session:
+                self._reload(session)
+        finally:
+            self._reload_lock.release()
+
+    def apply(self, change: LedgerChange) -> None:
+        with self._lock:
+            change(self)
+            if self._changes_during_load is not None:
+                self._changes_during_load.append(change)
+
+    def is_expired(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.ttl
+
+    def upsert(self, rows: Iterable[Mapping]) -> None:
+        """Add or replace rows with `id`, `trans_date`, `amount`, `category_id`, and `vendor`."""
+        rows = list(rows)
+        if not rows:
+            return
+        with self._lock:
+            # vendor codes are assigned under the lock too
+            columns = LedgerColumns(
+                id=np.array([row["id"] for row in rows], np.int64),
+                day=np.array([epoch_day(row["trans_date"]) for row in rows], np.int32),
+                amount_cents=np.array(
+                    [round(row["amount"] * 100) for row in rows], np.int64
+                ),
+                category_id=np.array(
+                    [
+                        UNCATEGORIZED
+                        if row["category_id"] is None
+                        else row["category_id"]
+                        for row in rows
+                    ],
+                    np.int32,
+                ),
+                vendor_code=np.array(
+                    [self._vendor_code(row["vendor"]) for row in rows], np.int32
+                ),
+            )
+
+            # updates are written in place; only new ids are appended
+            positions, found = self._positions(columns.id)
+            for array, values in zip(self._arrays, columns):
+                array[positions] = values[found]
+
+            if not found.all():
+                # SQLite may reuse the id of a deleted row, so drop those first
+                if self._dead_count:
+                    self._compact()
+                self._append(LedgerColumns(*(values[~found] for values in columns)))
+
+    def delete(self, ids: Iterable[int]) -> None:
+        with self._lock:
+            positions, _ = self._positions(np.fromiter(ids, np.int64))
+            self._live[positions] = False
+            self._dead_count += len(positions)
+
+    def uncategorize(self, category_id: int) -> None:
+        """Mirror `ON DELETE SET NULL` for a deleted category."""
+        with self._lock:
+            category_ids = self._arrays.category_id[: self._size]
+            category_ids[category_ids == category_id] = UNCATEGORIZED
+
+    def columns(self) -> LedgerColumns:
+        """
+        Views of the live rows. Later appends and deletes do not show through,
+        but in-place updates of existing rows may.
+        """
+        with self._lock:
+            if self._dead_count:
+                self._compact()
+            return LedgerColumns(*(array[: self._size] for array in self._arrays))
+
+    def reset(self) -> None:
+        with self._lock:
+            self.enabled = False
+            self._bind = None
+            self._clear()
+
+
+transaction_ledger = ColumnarLedger(ttl=LEDGER_SNAPSHOT_TTL)
+
+
+def get_ledger() -> ColumnarLedger | None:
+    """The ledger snapshot, None unless it has been loaded; an expired one is reloaded in the background."""
+    if not transaction_ledger.enabled:
+        return None
+    if transaction_ledger.is_expired():
+        transaction_ledger.reload_in_background()
+    return transaction_ledger
+
+
+def track_ledger_change(session: Session, change: LedgerChange) -> None:
+    """Apply `change` to the ledger snapshot once the session's transaction commits."""
+    if transaction_ledger.enabled:
+        session.info.setdefault("ledger_changes", []).append(change)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_ledger_changes(session: OrmSession) -> None:
+    for change in session.info.pop("ledger_changes", ()):
+        transaction_ledger.apply(change)
+
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _discard_ledger_changes(session: OrmSession, previous_transaction) -> None:
+    session.info.pop("ledger_changes", None)
@@ -1,7 +1,16 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlmodel import Session
+
+from .dependencies import engine, pin_reads_to_primary
 from .helpers import parse_pyproject_toml
-from .routers import categories, reports, transactions
+from .ledger import LEDGER_SNAPSHOT, transaction_ledger
+from .metrics import record_request_metrics
+from .partitions import ensure_future_partitions
+from .routers import categories, reports, status, transactions
 
 project_info = parse_pyproject_toml()
 
@@ -33,8 +42,31 @@ tags_metadata = [
         "name": "transactions",
         "description": "Manage transactions.",
     },
+    {
+        "name": "status",
+        "description": "Inspect database connection pools.",
+    },
 ]
 
+
+def _load_ledger() -> None:
+    with Session(engine) as session:
+        transaction_ledger.load(session)
+
+
+def _create_future_partitions() -> None:
+    with Session(engine) as session:
+        ensure_future_partitions(session)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(_create_future_partitions)
+    if LEDGER_SNAPSHOT:
+        await run_in_threadpool(_load_ledger)
+    yield
+
+
 app = FastAPI(
     title="Finance Tracker 💰",
     description=description,
@@ -46,11 +78,29 @@ app = FastAPI(
         "email": project_info.author_email,
     },
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
 )
 
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        pin_reads_to_primary(response)
+    return response
+
+
+app.middleware("http")(record_request_metrics)
+
 app.include_router(categories.router)
 app.include_router(transactions.router)
 app.include_router(reports.router)
+app.include_router(status.router)
+
+
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/")
@@ -0,0 +1,130 @@
+import time
+from collections.abc import AsyncIterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import Engine, event
+from starlette.requests import Request
+from starlette.responses import Response
+
+# requests that match no route share one label, so stray paths cannot add series
+UNMATCHED_ROUTE = "unmatched"
+STATEMENT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 50, 100)
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to send a response, body included, by route template.",
+    ["method", "route"],
+)
+REQUESTS = Counter(
+    "http_requests",
+    "Responses sent, by route template and status code.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests being handled.",
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "SQL statements executed per request.",
+    ["method", "route"],
+    buckets=STATEMENT_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds",
+    "Time spent executing SQL per request.",
+    ["method", "route"],
+)
+DB_STATEMENTS = Counter(
+    "db_statements",
+    "SQL statements executed, inside requests or not.",
+)
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    seconds: float = 0.0
+
+
+# set per request; sync routes and async sessions run in copies of the request's
+# context, which still share this one mutable object
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def route_label(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def _observe_request(
+    request: Request, status: int, start: float, stats: QueryStats
+) -> None:
+    elapsed = time.perf_counter() - start
+    REQUESTS_IN_FLIGHT.dec()
+
+    # the route is known only once the router has matched the request
+    labels = (request.method, route_label(request))
+    REQUEST_DURATION.labels(*labels).observe(elapsed)
+    REQUESTS.labels(*labels, str(status)).inc()
+    REQUEST_DB_STATEMENTS.labels(*labels).observe(stats.statements)
+    REQUEST_DB_DURATION.labels(*labels).observe(stats.seconds)
+
+
+async def _observe_when_sent(
+    body: AsyncIterator[bytes],
+    request: Request,
+    status: int,
+    start: float,
+    stats: QueryStats,
+) -> AsyncIterator[bytes]:
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        _observe_request(request, status, start, stats)
+
+
+async def record_request_metrics(request: Request, call_next) -> Response:
+    """
+    HTTP middleware: time each request and count the SQL it runs, up to the end
+    of its body, as streamed exports run their queries while the body is sent.
+    """
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        _observe_request(request, 500, start, stats)
+        raise
+    finally:
+        _query_stats.reset(token)
+
+    response.body_iterator = _observe_when_sent(
+        response.body_iterator,
+        request,
+        response.status_code,
+        start,
+        stats,
+    )
+    return response
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+    # kept on the execution context, which is discarded if the statement fails
+    context.statement_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.statement_started_at
+    DB_STATEMENTS.inc()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
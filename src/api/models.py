@@ -5,12 +5,32 @@ from typing import Annotated
 
 from fastapi import Query
 from pydantic import BaseModel, ConfigDict, HttpUrl, field_validator
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Index,
+    Integer,
+    TypeDecorator,
+    event,
+    func,
+    literal_column,
+    text,
+    type_coerce,
+)
 from sqlmodel import Field, Relationship, SQLModel
 
+# a cursor is base64 of the JSON sort key: at most about 60 bytes for the flag,
+# date, amount and id, plus 150 for a 25-character vendor of escaped control
+# characters (6 bytes each; 4-byte UTF-8 is less), so under 280 characters
+CURSOR_MAX_LENGTH = 300
+
 
 class PaginationInput(BaseModel):
     page: int = Field(default=1, ge=1)
     size: int = Field(default=25, ge=1, le=50)
+    cursor: str | None = Field(default=None, max_length=CURSOR_MAX_LENGTH)
+    include_total: bool | None = None  # defaults to True for pages, False for cursors
+    estimate_total: bool = False
 
 
 class TransactionQueryParams(BaseModel):
@@ -23,12 +43,14 @@ class PageLinks(BaseModel):
     current: HttpUrl
     prev: HttpUrl | None = None
     next: HttpUrl | None = None
+    prev_cursor: str | None = None
+    next_cursor: str | None = None
 
 
 class PageBase(BaseModel):
     data: list
-    total_row_count: int
-    total_page_count: int
+    total_row_count: int | None = None
+    total_page_count: int | None = None
     links: PageLinks
 
 
@@ -40,6 +62,36 @@ class MySQLModel(SQLModel):
 
 OptionalMoneyField = Field(max_digits=10, decimal_places=2, default=None)
 MoneyField = Field(max_digits=10, decimal_places=2)
+
+
+class Cents(TypeDecorator):
+    """
+    Money stored as integer cents, so the database sums and compares integers.
+    Python sees `Decimal` amounts; conversion happens when binding and loading.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect) -> int | None:
+        if value is None:
+            return None
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value))
+        return int(value.scaleb(2).to_integral_value())
+
+    def process_result_value(self, value, dialect) -> Decimal | None:
+        if value is None:
+            return None
+        # averages come back as floats or numerics of fractional cents
+        return Decimal(round(value)).scaleb(-2)
+
+
+def raw_cents(column):
+    """A `Cents` column read as its stored integer rather than as a `Decimal`."""
+    return type_coerce(column, Integer)
+
+
 OptionalStringField = Field(min_length=1, max_length=25, default=None)
 StringField = Field(min_length=1, max_length=25)
 
@@ -57,9 +109,20 @@ class CategoryBase(MySQLModel):
 
 
 class Category(CategoryBase, table=True):
+    __table_args__ = (
+        # names are unique regardless of case; also the upsert conflict target
+        Index("ix_category_name_lower", func.lower(text("name")), unique=True),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
+    budget: Decimal | None = Field(
+        max_digits=10, decimal_places=2, default=None, sa_type=Cents
+    )
 
-    transactions: list["Transaction"] = Relationship(back_populates="category")
+    # let the `ON DELETE SET NULL` foreign key detach transactions in one statement
+    transactions: list["Transaction"] = Relationship(
+        back_populates="category", passive_deletes=True
+    )
 
 
 class CategoryCreate(CategoryBase):
@@ -77,6 +140,10 @@ class CategoryUpdate(CategoryBase):
         return value
 
 
+class CategoryUpsert(MySQLModel):
+    budget: Decimal | None = OptionalMoneyField
+
+
 class CategoryRead(CategoryBase):
     id: int
 
@@ -94,7 +161,32 @@ class TransactionBase(MySQLModel):
 
 
 class Transaction(TransactionBase, table=True):
+    __table_args__ = (
+        # listing sort; its leading column also serves date range filters
+        Index("ix_transaction_listing_sort", "trans_date", "vendor", "amount", "id"),
+        # report grouping and the category foreign key action
+        Index("ix_transaction_category_id", "category_id"),
+        # trigram indexes let Postgres serve `ILIKE '%term%'` searches
+        Index(
+            "ix_transaction_vendor_trgm",
+            "vendor",
+            postgresql_using="gin",
+            postgresql_ops={"vendor": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_transaction_note_trgm",
+            "note",
+            postgresql_using="gin",
+            postgresql_ops={"note": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    # partitioned Postgres keys rows by (id, trans_date), as the partition key must
+    # be in the primary key; `id` alone stays mapped because it is still unique
+    # (one sequence) and SQLite needs it as the rowid alias for autoincrement and
+    # `transaction_search`. Autogenerate does not compare primary keys.
     id: int | None = Field(default=None, primary_key=True)
+    amount: Decimal = Field(max_digits=10, decimal_places=2, sa_type=Cents)
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime | None = None
 
@@ -109,6 +201,92 @@ class Transaction(TransactionBase, table=True):
     )
 
 
+class MonthlySpend(SQLModel, table=True):
+    """Running totals of `transaction` per month and category, kept in step by every write."""
+
+    __tablename__ = "monthly_spend"  # ty: ignore[invalid-assignment]
+    __table_args__ = (
+        # one row per month and category; uncategorized spend has a NULL category
+        Index(
+            "ix_monthly_spend_month_category",
+            "month",
+            func.coalesce(text("category_id"), literal_column("0")),
+            unique=True,
+        ),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    month: date  # first day of the month
+    category_id: int | None = Field(
+        default=None, foreign_key="category.id", ondelete="CASCADE"
+    )
+    amount_spent: Decimal = Field(
+        default=0, max_digits=14, decimal_places=2, sa_type=Cents
+    )
+    transaction_count: int = 0
+
+
+class CompactedMonth(SQLModel, table=True):
+    """A month whose transactions were archived and purged; `monthly_spend` keeps its totals."""
+
+    __tablename__ = "compacted_month"  # ty: ignore[invalid-assignment]
+
+    month: date = Field(primary_key=True)  # first day of the month
+    transaction_count: int
+    compacted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# SQLite stand-in for the trigram indexes: an FTS5 trigram index over vendor and
+# note, kept in sync with the transaction table by triggers
+SQLITE_SEARCH_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS transaction_search USING fts5(
+        vendor, note, content='transaction', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_search_ai AFTER INSERT ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(rowid, vendor, note)
+        VALUES (new.id, new.vendor, new.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_search_ad AFTER DELETE ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(transaction_search, rowid, vendor, note)
+        VALUES ('delete', old.id, old.vendor, old.note);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS transaction_search_au AFTER UPDATE ON "transaction"
+    BEGIN
+        INSERT INTO transaction_search(transaction_search, rowid, vendor, note)
+        VALUES ('delete', old.id, old.vendor, old.note);
+        INSERT INTO transaction_search(rowid, vendor, note)
+        VALUES (new.id, new.vendor, new.note);
+    END
+    """,
+)
+
+event.listen(
+    SQLModel.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(
+        Transaction.__table__,  # ty: ignore[unresolved-attribute]
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Transaction.__table__,  # ty: ignore[unresolved-attribute]
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS transaction_search").execute_if(dialect="sqlite"),
+)
+
+
 class TransactionCreate(TransactionBase):
     category_id: int | None = None
 
@@ -132,12 +310,86 @@ class TransactionPage(PageBase):
     data: list[TransactionRead]
 
 
+class TransactionBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class TransactionBulkResult(BaseModel):
+    inserted_count: int
+    errors: list[TransactionBulkError]
+
+
 class DeleteResponse(BaseModel):
     detail: str
 
 
+class PoolStatus(BaseModel):
+    engine: str
+    pool_class: str
+    size: int | None = None
+    checked_in: int | None = None
+    checked_out: int | None = None
+    overflow: int | None = None
+    max_overflow: int | None = None
+    checkouts: int | None = None
+    timeouts: int | None = None
+    wait_ms_total: float | None = None
+    wait_ms_max: float | None = None
+
+
 class MonthlySummary(BaseModel):
     category_id: int | None
     category_name: str | None
     amount_spent: Decimal = MoneyField
     budget: Decimal | None = OptionalMoneyField
+
+
+class AggregateRow(BaseModel):
+    """Only the requested dimensions and metrics are present."""
+
+    category_id: int | None = None
+    category_name: str | None = None
+    vendor: str | None = None
+    period: date | None = None  # first day of the period
+    count: int | None = None
+    sum: Decimal | None = None
+    avg: Decimal | None = None
+    min: Decimal | None = None
+    max: Decimal | None = None
+
+
+class CategoryStats(BaseModel):
+    category_id: int | None
+    category_name: str | None
+    count: int
+    total: Decimal
+    mean: Decimal
+    std: Decimal  # population standard deviation
+    p50: Decimal  # median transaction
+    p90: Decimal
+    p99: Decimal
+    latest_month: str  # YYYY-MM, the last month with any spend
+    latest_month_total: Decimal
+    previous_month_total: Decimal
+    month_over_month_growth: float | None  # None when the previous month had no spend
+
+
+class BudgetTrendMonth(BaseModel):
+    month: str  # YYYY-MM
+    amount_spent: Decimal = MoneyField
+    # budget minus spend; None for categories without a budget
+    variance: Decimal | None = OptionalMoneyField
+    cumulative_variance: Decimal | None = OptionalMoneyField
+
+
+class BudgetTrendCategory(BaseModel):
+    category_id: int | None
+    category_name: str | None
+    budget: Decimal | None = OptionalMoneyField
+    months: list[BudgetTrendMonth]
+
+
+class BudgetTrend(BaseModel):
+    months: list[str]
+    categories: list[BudgetTrendCategory]
@@ -0,0 +1,148 @@
+import re
+import threading
+import time
+from collections.abc import Iterable
+from datetime import date, datetime
+
+from dateutil.relativedelta import relativedelta
+from decouple import config
+from sqlalchemy import Engine, text
+from sqlmodel import Session
+
+# months past the current one that always have a partition ready
+PARTITION_MONTHS_AHEAD = config("PARTITION_MONTHS_AHEAD", default=3, cast=int)
+# partitions may be detached or dropped by other processes; re-read the catalog this often
+PARTITION_REGISTRY_TTL = config("PARTITION_REGISTRY_TTL", default=60, cast=float)
+# serializes partition creation across workers; any constant unique to this use
+PARTITION_LOCK_KEY = 7_202_501
+
+_PARTITION_NAME = re.compile(r"^transaction_y(\d{4})m(\d{2})$")
+
+
+def partition_name(month: date) -> str:
+    return f"transaction_y{month.year:04d}m{month.month:02d}"
+
+
+def month_start(value: date | datetime) -> date:
+    # `TransactionUpdate` takes datetimes; partitions are keyed by plain dates
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1)
+
+
+def create_partition_sql(month: date) -> str:
+    start = month_start(month)
+    end = start + relativedelta(months=1)
+    return (
+        f'CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF "transaction" '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def partition_months(session: Session) -> set[date] | None:
+    """Months with a partition, or None when `transaction` is not partitioned."""
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+
+    is_partitioned = session.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            """WHERE partrelid = to_regclass('"transaction"'))"""
+        )
+    ).scalar()
+    if not is_partitioned:
+        return None
+
+    names = session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            """WHERE pg_inherits.inhparent = to_regclass('"transaction"')"""
+        )
+    ).scalars()
+    months = set()
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.add(date(int(match[1]), int(match[2]), 1))
+    return months
+
+
+class PartitionRegistry:
+    """
+    Monthly partitions of `transaction` known to exist, per engine, so writes
+    only reach the catalog when a month is new. Missing partitions are created
+    in a short transaction of their own: creating one locks all of `transaction`
+    until commit, which must not wait on the write that needed it.
+    The catalog is read again after `ttl` seconds, as a partition dropped by
+    another process would otherwise stay known here.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._months: dict[Engine, tuple[float, set[date] | None]] = {}
+        self._lock = threading.Lock()
+
+    def _known_months(self, session: Session) -> set[date] | None:
+        bind = session.get_bind()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._months.get(bind)
+        if entry is not None and now - entry[0] < self.ttl:
+            return entry[1]
+
+        months = partition_months(session)
+        with self._lock:
+            self._months[bind] = (now, months)
+        return months
+
+    def ensure(self, session: Session, dates: Iterable[date | datetime]) -> list[str]:
+        """
+        Create the partitions the given dates fall in, if missing; return their
+        names. Call it before `session` writes to `transaction`, as the partitions
+        are created on another connection that would wait for its locks.
+        """
+        known = self._known_months(session)
+        if known is None:
+            return []
+
+        missing = sorted({month_start(value) for value in dates} - known)
+        if not missing:
+            return []
+
+        bind = session.get_bind()
+        with Session(bind) as ddl_session:
+            ddl_session.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY}
+            )
+            for month in missing:
+                ddl_session.execute(text(create_partition_sql(month)))
+            ddl_session.commit()
+        self.record(bind, missing)
+        return [partition_name(month) for month in missing]
+
+    def record(self, bind: Engine, months: Iterable[date]) -> None:
+        with self._lock:
+            entry = self._months.get(bind)
+            if entry is not None and entry[1] is not None:
+                entry[1].update(months)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._months.clear()
+
+
+transaction_partitions = PartitionRegistry(ttl=PARTITION_REGISTRY_TTL)
+
+
+def ensure_partitions(session: Session, dates: Iterable[date | datetime]) -> list[str]:
+    return transaction_partitions.ensure(session, dates)
+
+
+def ensure_future_partitions(
+    session: Session, months_ahead: int = PARTITION_MONTHS_AHEAD
+) -> list[str]:
+    """Create partitions from this month through `months_ahead`."""
+    this_month = date.today().replace(day=1)
+    months = [this_month + relativedelta(months=n) for n in range(months_ahead + 1)]
+    return ensure_partitions(session, months)
@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Any
+from uuid import uuid4
+
+from decouple import config
+from sqlalchemy import URL, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from .models import PoolStatus
+
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
+# PgBouncer in transaction mode owns pooling and cannot keep prepared statements
+DB_PGBOUNCER = config("DB_PGBOUNCER", default=False, cast=bool)
+DB_QUERY_CACHE_SIZE = config("DB_QUERY_CACHE_SIZE", default=500, cast=int)
+DB_STATEMENT_CACHE_SIZE = config("DB_STATEMENT_CACHE_SIZE", default=100, cast=int)
+
+
+class CheckoutTimer:
+    """Time spent waiting for pool connections, shared by the threads of one pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+class TimedPoolMixin:
+    checkout_timer: CheckoutTimer
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkout_timer = CheckoutTimer()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()  # ty: ignore[unresolved-attribute]
+        except exc.TimeoutError:
+            self.checkout_timer.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.checkout_timer.record(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_engine_options(url: URL, is_async: bool = False) -> dict:
+    """Keyword arguments for `create_engine` / `create_async_engine` from config."""
+    options: dict[str, Any] = {"query_cache_size": DB_QUERY_CACHE_SIZE}
+
+    # SQLite connections are local files; SQLAlchemy's defaults suit them
+    if url.get_backend_name() == "sqlite":
+        return options
+
+    if DB_PGBOUNCER:
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+
+    # only asyncpg prepares statements; psycopg2 sends plain queries
+    if is_async:
+        if DB_PGBOUNCER:
+            options["connect_args"] = {
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+                # unique names cannot collide on a server connection shared through PgBouncer
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        else:
+            options["connect_args"] = {
+                "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE
+            }
+
+    return options
+
+
+def get_pool_status(name: str, pool: Pool) -> PoolStatus:
+    status = PoolStatus(engine=name, pool_class=type(pool).__name__)
+
+    if isinstance(pool, QueuePool):
+        status.size = pool.size()
+        status.checked_in = pool.checkedin()
+        status.checked_out = pool.checkedout()
+        # negative while the pool is still filling up to `size`
+        status.overflow = max(pool.overflow(), 0)
+        status.max_overflow = pool._max_overflow
+
+    if isinstance(pool, TimedPoolMixin):
+        timer = pool.checkout_timer
+        status.checkouts = timer.checkouts
+        status.timeouts = timer.timeouts
+        status.wait_ms_total = round(timer.wait_seconds_total * 1000, 3)
+        status.wait_ms_max = round(timer.wait_seconds_max * 1000, 3)
+
+    return status
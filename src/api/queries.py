@@ -0,0 +1,142 @@
+from datetime import date
+
+from sqlalchemy import literal_column
+from sqlmodel import case, func, nulls_last, outerjoin, select
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+from .helpers import DateRange
+from .models import Category, MonthlySpend, Transaction, TransactionQueryParams
+from .search import normalize_search_term, search_filter
+
+# RETURNING cannot correlate a subquery with the table being written, so name it directly
+_category_name = (
+    select(Category.name)
+    .where(Category.id == literal_column('"transaction".category_id'))
+    .scalar_subquery()
+    .label("category_name")
+)
+
+# everything `TransactionRead` needs, fetched in the same statement as the write
+TRANSACTION_READ_COLUMNS = (
+    Transaction.id,
+    Transaction.trans_date,
+    Transaction.amount,
+    Transaction.vendor,
+    Transaction.note,
+    Transaction.created_at,
+    Transaction.updated_at,
+    Transaction.category_id,
+    _category_name,
+)
+
+# listings and exports read plain rows, with the category name joined in
+TRANSACTION_ROW_COLUMNS = (
+    *TRANSACTION_READ_COLUMNS[:-1],
+    Category.name.label("category_name"),  # ty: ignore[unresolved-attribute]
+)
+
+# listing order; `id` breaks ties so keyset cursors always name a single row
+SORT_COLUMNS = (
+    Transaction.trans_date,
+    Transaction.vendor,
+    Transaction.amount,
+    Transaction.id,
+)
+
+# budgeted categories first, then by name with uncategorized spend last
+REPORT_ORDER = (
+    case((Category.budget.is_(None), 1), else_=0),  # ty: ignore[unresolved-attribute]
+    nulls_last(Category.name),
+)
+
+
+def transaction_rows_query() -> SelectOfScalar:
+    return (
+        select(*TRANSACTION_ROW_COLUMNS)
+        .select_from(Transaction)
+        .outerjoin(Category, Transaction.category_id == Category.id)  # ty: ignore[invalid-argument-type]
+    )
+
+
+def filter_transactions(
+    query: SelectOfScalar, query_params: TransactionQueryParams, dialect_name: str
+) -> tuple[SelectOfScalar, dict]:
+    """Apply listing filters; also return the filters normalized for links and caching."""
+    query_map: dict = query_params.model_dump()
+
+    # search filter
+    if query_params.q is not None:
+        q = normalize_search_term(query_params.q)
+        query_map.update({"q": q})
+        query = query.where(search_filter(q, dialect_name))
+
+    # date range filter
+    if query_params.start_date is not None:
+        query = query.where(Transaction.trans_date >= query_params.start_date)
+    if query_params.end_date is not None:
+        query = query.where(Transaction.trans_date <= query_params.end_date)
+
+    return query, query_map
+
+
+def monthly_report_query(month_range: DateRange) -> Select:
+    # subquery reading the month's totals from the rollup, one row per category
+    subq = (
+        select(MonthlySpend.category_id, MonthlySpend.amount_spent)
+        .where(
+            MonthlySpend.month == month_range.start,
+            MonthlySpend.transaction_count > 0,
+        )
+        .subquery()
+    )
+
+    # final query to get category info
+    query = (
+        select(
+            Category.id.label("category_id"),  # ty: ignore[unresolved-attribute]
+            Category.name.label("category_name"),  # ty: ignore[unresolved-attribute]
+            func.coalesce(subq.c.amount_spent, 0).label("amount_spent"),
+            Category.budget,
+        )
+        .select_from(
+            outerjoin(Category, subq, Category.id == subq.c.category_id, full=True)
+        )
+        .order_by(*REPORT_ORDER)
+    )
+
+    return query
+
+
+def budget_trend_query(start: date, end: date) -> Select:
+    # one row per category and month with spend; categories without any spend
+    # in the range still appear once, with a NULL month
+    subq = (
+        select(
+            MonthlySpend.category_id,
+            MonthlySpend.month,
+            func.sum(MonthlySpend.amount_spent).label("amount_spent"),
+        )
+        .where(
+            MonthlySpend.month >= start,
+            MonthlySpend.month <= end,
+            MonthlySpend.transaction_count > 0,
+        )
+        .group_by(MonthlySpend.category_id, MonthlySpend.month)
+        .subquery()
+    )
+
+    query = (
+        select(
+            func.coalesce(Category.id, subq.c.category_id).label("category_id"),
+            Category.name.label("category_name"),  # ty: ignore[unresolved-attribute]
+            Category.budget,
+            subq.c.month,
+            subq.c.amount_spent,
+        )
+        .select_from(
+            outerjoin(Category, subq, Category.id == subq.c.category_id, full=True)
+        )
+        .order_by(*REPORT_ORDER, subq.c.month)
+    )
+
+    return query
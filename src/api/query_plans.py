@@ -0,0 +1,150 @@
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import Executable, update
+from sqlmodel import Session
+
+from .helpers import DateRange
+from .models import Transaction
+from .partitions import partition_months, partition_name
+from .queries import (
+    SORT_COLUMNS,
+    budget_trend_query,
+    monthly_report_query,
+    transaction_rows_query,
+)
+from .search import search_filter
+
+
+class PlanCheck(NamedTuple):
+    name: str
+    statement: Executable
+    expected_index: dict[str, str]  # dialect name -> index the plan must use
+    # Postgres names the per-partition copies of an index after the partition
+    # and columns, e.g. `transaction_y2025m07_category_id_idx`
+    partition_index_suffix: str | None = None
+    # months the plan may read when `transaction` is partitioned; None for any
+    pruned_to: frozenset[date] | None = None
+
+
+class PlanResult(NamedTuple):
+    name: str
+    passed: bool
+    plan: str
+
+
+def get_plan_checks(dialect_name: str) -> list[PlanCheck]:
+    """Representative statements for the hot paths, mirroring how the routers build them."""
+    listing_order = [column.desc() for column in SORT_COLUMNS]
+    month = DateRange(start=date(2025, 7, 1), end=date(2025, 7, 31))
+
+    return [
+        PlanCheck(
+            name="list transactions",
+            statement=transaction_rows_query().order_by(*listing_order).limit(25),
+            expected_index={
+                "postgresql": "ix_transaction_listing_sort",
+                "sqlite": "ix_transaction_listing_sort",
+            },
+            partition_index_suffix="_trans_date_vendor_amount_id_idx",
+        ),
+        PlanCheck(
+            name="list transactions by date",
+            statement=transaction_rows_query()
+            .where(
+                Transaction.trans_date >= month.start,
+                Transaction.trans_date <= month.end,
+            )
+            .order_by(*listing_order)
+            .limit(25),
+            expected_index={
+                "postgresql": "ix_transaction_listing_sort",
+                "sqlite": "ix_transaction_listing_sort",
+            },
+            partition_index_suffix="_trans_date_vendor_amount_id_idx",
+            pruned_to=frozenset([month.start]),
+        ),
+        PlanCheck(
+            name="search transactions",
+            statement=transaction_rows_query()
+            .where(search_filter("kroger", dialect_name))
+            .order_by(*listing_order)
+            .limit(25),
+            expected_index={
+                "postgresql": "ix_transaction_vendor_trgm",
+                "sqlite": "transaction_search",
+            },
+            partition_index_suffix="_vendor_idx",
+        ),
+        PlanCheck(
+            name="monthly report",
+            statement=monthly_report_query(month),
+            expected_index={
+                "postgresql": "ix_monthly_spend_month_category",
+                "sqlite": "ix_monthly_spend_month_category",
+            },
+        ),
+        PlanCheck(
+            name="budget trend",
+            statement=budget_trend_query(date(2024, 7, 1), month.start),
+            expected_index={
+                "postgresql": "ix_monthly_spend_month_category",
+                "sqlite": "ix_monthly_spend_month_category",
+            },
+        ),
+        PlanCheck(
+            # the statement the `ON DELETE SET NULL` action runs for a deleted category
+            name="delete category",
+            statement=update(Transaction)
+            .where(Transaction.category_id == 1)
+            .values(category_id=None),
+            expected_index={
+                "postgresql": "ix_transaction_category_id",
+                "sqlite": "ix_transaction_category_id",
+            },
+            partition_index_suffix="_category_id_idx",
+        ),
+    ]
+
+
+def explain(session: Session, statement: Executable) -> str:
+    dialect = session.get_bind().dialect
+    sql = statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN" if dialect.name == "sqlite" else "EXPLAIN"
+
+    rows = session.connection().exec_driver_sql(f"{prefix} {sql}").all()
+
+    # SQLite plans are (id, parent, notused, detail); Postgres plans are one text column
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def check_query_plans(session: Session) -> list[PlanResult]:
+    """
+    Explain each hot-path statement and confirm it uses its supporting index,
+    and, with `transaction` partitioned, that date filters prune partitions.
+    Sequential scans are disabled on Postgres so that small development
+    databases report whether an index can be used, not just whether it is cheaper.
+    """
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        session.connection().exec_driver_sql("SET LOCAL enable_seqscan = off")
+    months = partition_months(session)
+
+    results = []
+    for check in get_plan_checks(dialect_name):
+        plan = explain(session, check.statement)
+        passed = check.expected_index[dialect_name] in plan
+        if months is not None:
+            passed = passed or (
+                check.partition_index_suffix is not None
+                and check.partition_index_suffix in plan
+            )
+            if check.pruned_to is not None:
+                passed = passed and not any(
+                    partition_name(month) in plan for month in months - check.pruned_to
+                )
+        results.append(PlanResult(name=check.name, passed=passed, plan=plan))
+
+    session.rollback()
+
+    return results
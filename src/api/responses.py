@@ -0,0 +1,68 @@
+from collections.abc import Callable, Iterable, Sequence
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import Row
+
+from .models import Category, PageBase
+
+
+def _default(value: Any) -> Any:
+    # match pydantic's JSON output, which writes money as strings
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError
+
+
+class FastJSONResponse(Response):
+    """
+    Encode already-shaped payloads with orjson.
+    Routes that return this skip FastAPI's validation against `response_model`,
+    which then only documents the schema.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def category_payload(category: Category) -> dict:
+    """Shape of `CategoryRead`."""
+    return {"name": category.name, "budget": category.budget, "id": category.id}
+
+
+def transaction_row_payload(row: Row) -> dict:
+    """Shape of `TransactionRead` from a transaction row with its `category_name`."""
+    return {
+        "trans_date": row.trans_date,
+        "amount": row.amount,
+        "vendor": row.vendor,
+        "note": row.note,
+        "id": row.id,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "category": (
+            {"id": row.category_id, "name": row.category_name}
+            if row.category_id is not None
+            else None
+        ),
+    }
+
+
+def page_payload(page: PageBase, item_payload: Callable[[Any], dict]) -> dict:
+    return {
+        "data": [item_payload(item) for item in page.data],
+        "total_row_count": page.total_row_count,
+        "total_page_count": page.total_page_count,
+        "links": page.links,
+    }
+
+
+def rows_payload(rows: Iterable[Row]) -> Sequence[dict]:
+    return [row._asdict() for row in rows]
@@ -0,0 +1,210 @@
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+import pyarrow.parquet as pq
+from dateutil.relativedelta import relativedelta
+from decouple import config
+from sqlalchemy import delete, or_, text, tuple_
+from sqlmodel import Session, select
+
+from .aggregates import Granularity, date_bucket
+from .cache import transaction_counts
+from .exporters import TRANSACTION_SCHEMA, ColumnarFormat, stream_columnar
+from .ledger import track_ledger_change
+from .models import CompactedMonth, Transaction
+from .partitions import partition_months, partition_name
+from .queries import transaction_rows_query
+from .rollup import rebuild_monthly_spend
+
+# transactions older than this many years are archived and purged
+RETENTION_YEARS = config("RETENTION_YEARS", default=7, cast=int)
+ARCHIVE_DIR = config("ARCHIVE_DIR", default="archive", cast=Path)
+PURGE_BATCH_SIZE = 10_000
+
+
+class ArchivedVersion(NamedTuple):
+    id: int
+    updated_at: datetime | None
+
+
+class CompactionResult(NamedTuple):
+    month: date
+    archive_path: Path
+    archived_count: int
+    purged_count: int
+
+
+def retention_cutoff(today: date, years: int = RETENTION_YEARS) -> date:
+    """First day of the oldest month kept; whole months before it are compacted."""
+    return today.replace(day=1) - relativedelta(years=years)
+
+
+def months_to_compact(session: Session, cutoff: date) -> list[date]:
+    month = date_bucket(
+        Transaction.trans_date, Granularity.MONTH, session.get_bind().dialect.name
+    )
+    months = session.exec(
+        select(month).where(Transaction.trans_date < cutoff).distinct().order_by(month)
+    ).all()
+    # SQLite buckets are ISO strings
+    return [
+        value if isinstance(value, date) else date.fromisoformat(value)
+        for value in months
+    ]
+
+
+def _month_filter(month: date):
+    next_month = month + relativedelta(months=1)
+    return (Transaction.trans_date >= month) & (Transaction.trans_date < next_month)
+
+
+def archive_month(
+    session: Session, month: date, archive_dir: Path
+) -> tuple[Path, list[ArchivedVersion]]:
+    """
+    Write a month's transactions to a zstd-compressed Parquet file; return its
+    path and the version of each row it holds. Every run writes a new file, so
+    re-running a month that was only partly purged never overwrites rows
+    archived before.
+    """
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = archive_dir / f"transactions_{month:%Y-%m}.{stamp}.parquet"
+    partial_path = path.with_suffix(".partial")
+
+    query = (
+        transaction_rows_query().where(_month_filter(month)).order_by(Transaction.id)  # ty: ignore[invalid-argument-type]
+    )
+    # the stream closes its session, so it gets one of its own
+    with open(partial_path, "wb") as f:
+        f.writelines(
+            stream_columnar(
+                Session(session.get_bind()),
+                query,
+                TRANSACTION_SCHEMA,
+                ColumnarFormat.PARQUET,
+            )
+        )
+    partial_path.rename(path)
+
+    # read back what was written, so only those rows are purged; timestamps are
+    # stored as naive UTC, like the `updated_at` column they are compared with
+    archived = pq.read_table(path, columns=["id", "updated_at"]).to_pylist()
+    versions = [
+        ArchivedVersion(
+            row["id"], row["updated_at"] and row["updated_at"].replace(tzinfo=None)
+        )
+        for row in archived
+    ]
+    return path, versions
+
+
+def _is_archived_version(versions: list[ArchivedVersion]):
+    """Rows still as they were archived: same id, not updated since."""
+    never_updated = [version.id for version in versions if version.updated_at is None]
+    updated = [tuple(version) for version in versions if version.updated_at is not None]
+    return or_(
+        Transaction.id.in_(never_updated) & Transaction.updated_at.is_(None),  # ty: ignore[unresolved-attribute]
+        tuple_(Transaction.id, Transaction.updated_at).in_(updated),
+    )
+
+
+def _purge_rows(
+    session: Session, versions: list[ArchivedVersion], batch_size: int
+) -> int:
+    """Delete archived rows in batches, committing each one."""
+    purged = 0
+    for start in range(0, len(versions), batch_size):
+        ids = (
+            session.execute(
+                delete(Transaction)
+                .where(_is_archived_version(versions[start : start + batch_size]))
+                .returning(Transaction.id)
+                .execution_options(synchronize_session=False)
+            )
+            .scalars()
+            .all()
+        )
+
+        # the rollup is deliberately left as it is: it now stands in for these rows;
+        # a reload in progress replays the change later, so it binds this batch
+        track_ledger_change(session, lambda ledger, ids=ids: ledger.delete(ids))
+        session.commit()
+        purged += len(ids)
+    return purged
+
+
+def _truncate_partition(
+    session: Session, month: date, versions: list[ArchivedVersion]
+) -> int | None:
+    """
+    Empty a month's partition, the cheapest purge, if it holds exactly the
+    archived rows; return the rows it held, or None if it was left alone.
+    The partition itself stays, so API processes that know it exists can still
+    write transactions dated in that month.
+    """
+    name = partition_name(month)
+    # blocks writes to the month until the truncate commits
+    session.execute(text(f"LOCK TABLE {name} IN EXCLUSIVE MODE"))
+    current = session.exec(
+        select(Transaction.id, Transaction.updated_at).where(_month_filter(month))
+    ).all()
+    if {tuple(row) for row in current} != {tuple(version) for version in versions}:
+        session.rollback()
+        return None
+
+    ids = [row.id for row in current]
+    track_ledger_change(session, lambda ledger, ids=ids: ledger.delete(ids))
+    session.execute(text(f"TRUNCATE {name}"))
+    session.commit()
+    return len(ids)
+
+
+def compact_month(
+    session: Session,
+    month: date,
+    archive_dir: Path = ARCHIVE_DIR,
+    batch_size: int = PURGE_BATCH_SIZE,
+) -> CompactionResult:
+    """
+    Archive a month's transactions, settle its `monthly_spend` totals, and purge
+    the archived rows. The rollup is recomputed from the rows only the first time
+    a month is compacted; after that it is the sole record of the purged ones.
+    Rows written to the month after the archive was taken are not purged; the
+    next run archives them.
+    """
+    archive_path, versions = archive_month(session, month, archive_dir)
+
+    compacted = session.get(CompactedMonth, month)
+    if compacted is None:
+        rebuild_monthly_spend(session, month)
+        compacted = CompactedMonth(month=month, transaction_count=0)
+        session.add(compacted)
+    session.commit()
+
+    purged_count = None
+    months = partition_months(session)
+    if months is not None and month in months:
+        purged_count = _truncate_partition(session, month, versions)
+    if purged_count is None:
+        purged_count = _purge_rows(session, versions, batch_size)
+    transaction_counts.invalidate()
+
+    compacted.transaction_count += purged_count
+    session.commit()
+
+    return CompactionResult(month, archive_path, len(versions), purged_count)
+
+
+def compact_transactions(
+    session: Session,
+    cutoff: date,
+    archive_dir: Path = ARCHIVE_DIR,
+    batch_size: int = PURGE_BATCH_SIZE,
+) -> list[CompactionResult]:
+    """Compact every month before `cutoff` that still has transactions, oldest first."""
+    return [
+        compact_month(session, month, archive_dir, batch_size)
+        for month in months_to_compact(session, cutoff)
+    ]
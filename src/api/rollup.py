@@ -0,0 +1,128 @@
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from datetime import date
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import delete, insert, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, func, select
+
+from .aggregates import Granularity, date_bucket
+from .models import CompactedMonth, MonthlySpend, Transaction
+
+# rollup key: (first day of the month, category id)
+SpendKey = tuple[date, int | None]
+SpendDeltas = dict[SpendKey, tuple[Decimal, int]]
+
+
+def spend_deltas(
+    added: Iterable[Mapping] = (), removed: Iterable[Mapping] = ()
+) -> SpendDeltas:
+    """Net rollup changes for transaction rows (`trans_date`, `amount`, `category_id`)."""
+    deltas: defaultdict[SpendKey, tuple[Decimal, int]] = defaultdict(
+        lambda: (Decimal(0), 0)
+    )
+    for sign, rows in ((1, added), (-1, removed)):
+        for row in rows:
+            key = (row["trans_date"].replace(day=1), row["category_id"])
+            amount, count = deltas[key]
+            deltas[key] = (amount + sign * Decimal(row["amount"]), count + sign)
+    return dict(deltas)
+
+
+def apply_spend_deltas(session: Session, deltas: SpendDeltas) -> None:
+    """
+    Add changes to the rollup in one `INSERT ... ON CONFLICT` statement.
+    Run it in the same database transaction as the writes it describes.
+    Rows go in index order, so concurrent writers lock them in the same order
+    and cannot deadlock on each other.
+    """
+    changes = sorted(
+        (item for item in deltas.items() if item[1] != (0, 0)),
+        key=lambda item: (item[0][0], item[0][1] or 0),
+    )
+    if not changes:
+        return
+
+    dialect_name = session.get_bind().dialect.name
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    statement = dialect.insert(MonthlySpend).values(
+        [
+            {
+                "month": month,
+                "category_id": category_id,
+                "amount_spent": amount,
+                "transaction_count": count,
+            }
+            for (month, category_id), (amount, count) in changes
+        ]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            MonthlySpend.month,
+            # must match the index expression exactly, so no bound parameter
+            func.coalesce(MonthlySpend.category_id, literal_column("0")),
+        ],
+        set_={
+            "amount_spent": MonthlySpend.amount_spent + statement.excluded.amount_spent,
+            "transaction_count": MonthlySpend.transaction_count
+            + statement.excluded.transaction_count,
+        },
+    )
+    session.execute(statement)
+
+
+def detach_category_spend(session: Session, category_id: int) -> None:
+    """
+    Add a category's totals to uncategorized spend, as its transactions are about
+    to be. Deleting the category then removes its own rows by cascade.
+    """
+    rows = session.exec(
+        select(
+            MonthlySpend.month,
+            MonthlySpend.amount_spent,
+            MonthlySpend.transaction_count,
+        ).where(MonthlySpend.category_id == category_id)
+    ).all()
+
+    apply_spend_deltas(
+        session, {(month, None): (amount, count) for month, amount, count in rows}
+    )
+
+
+def rebuild_monthly_spend(session: Session, month: date | None = None) -> int:
+    """
+    Recompute the rollup from `transaction`, for one month or all of them; return
+    the rows written. Compacted months are left alone, since their transactions
+    are gone and the rollup is the only record of them. The caller commits.
+    """
+    dialect_name = session.get_bind().dialect.name
+    month_bucket = date_bucket(Transaction.trans_date, Granularity.MONTH, dialect_name)
+    compacted = select(CompactedMonth.month)
+    totals = (
+        select(
+            month_bucket.label("month"),
+            Transaction.category_id,
+            func.sum(Transaction.amount).label("amount_spent"),
+            func.count().label("transaction_count"),
+        )
+        .where(month_bucket.not_in(compacted))
+        .group_by(month_bucket, Transaction.category_id)
+    )
+    stale = delete(MonthlySpend).where(MonthlySpend.month.not_in(compacted))  # ty: ignore[unresolved-attribute]
+
+    if month is not None:
+        next_month = month + relativedelta(months=1)
+        totals = totals.where(
+            Transaction.trans_date >= month, Transaction.trans_date < next_month
+        )
+        stale = stale.where(MonthlySpend.month == month)
+
+    session.execute(stale)
+    result = session.execute(
+        insert(MonthlySpend).from_select(
+            ["month", "category_id", "amount_spent", "transaction_count"], totals
+        )
+    )
+    return result.rowcount
@@ -1,31 +1,49 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Annotated
+
+from fastapi import APIRouter, Body, HTTPException, Path, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import select
 
-from ..dependencies import SessionDep
+from ..cache import category_snapshots, get_categories, transaction_counts
+from ..dependencies import DbDep, ReadDbDep, ReadSessionDep, SessionDep
+from ..exporters import (
+    CATEGORY_SCHEMA,
+    EXPORT_MEDIA_TYPES,
+    ColumnarFormat,
+    stream_columnar,
+)
+from ..ingest import upsert_categories
+from ..ledger import track_ledger_change
 from ..models import (
     Category,
     CategoryCreate,
     CategoryRead,
     CategoryUpdate,
+    CategoryUpsert,
     DeleteResponse,
 )
+from ..responses import FastJSONResponse
+from ..rollup import detach_category_spend
 
 router = APIRouter(
     prefix="/categories",
     tags=["categories"],
 )
 
+UPSERT_MAX_ROWS = 1000
+
 
 def _check_for_existing_category(session: SessionDep, category_name: str) -> None:
     """Check if a category with the given name already exists."""
 
-    db_category_existing = session.exec(
-        select(Category).where(Category.name == category_name)
-    ).first()
-    if db_category_existing is not None:
+    existing_id = get_categories(session).ids_by_name.get(category_name.lower())
+    if existing_id is not None:
         raise HTTPException(
             status_code=409,
-            detail=f"Category with name '{category_name}' already exists (ID {db_category_existing.id})",
+            detail=f"Category with name '{category_name}' already exists (ID {existing_id})",
         )
 
 
@@ -33,37 +51,44 @@ def _category_name_changed(category_data: dict, db_category: Category) -> bool:
     return "name" in category_data and category_data["name"] != db_category.name
 
 
-@router.post("/", response_model=CategoryRead, status_code=status.HTTP_201_CREATED)
-def create_category(category: CategoryCreate, session: SessionDep):
+def _commit_category(session: SessionDep, category_name: str) -> None:
+    """Commit a category write; a concurrent write may still have claimed the name."""
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        category_snapshots.invalidate()
+        _check_for_existing_category(session, category_name)
+        raise
+    category_snapshots.invalidate()
+
+
+def _create_category(session: SessionDep, category: CategoryCreate) -> Category:
     db_category = Category.model_validate(category)
 
     _check_for_existing_category(session, category.name)
 
     session.add(db_category)
-    session.commit()
+    _commit_category(session, category.name)
     session.refresh(db_category)
     return db_category
 
 
-@router.get("/", response_model=list[CategoryRead])
-def read_categories(session: SessionDep):
-    categories = session.exec(select(Category).order_by(Category.name)).all()
-    return categories
+def _read_categories(session: SessionDep) -> tuple[dict, ...]:
+    return get_categories(session).categories
 
 
-@router.get("/{category_id}", response_model=CategoryRead)
-def read_category(category_id: int, session: SessionDep):
+def _read_category(session: SessionDep, category_id: int) -> Category:
     category = session.get(Category, category_id)
     if category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
 
 
-@router.patch("/{category_id}", response_model=CategoryRead)
-def update_category(category_id: int, category: CategoryUpdate, session: SessionDep):
-    db_category = session.get(Category, category_id)
-    if db_category is None:
-        raise HTTPException(status_code=404, detail="Category not found")
+def _update_category(
+    session: SessionDep, category_id: int, category: CategoryUpdate
+) -> Category:
+    db_category = _read_category(session, category_id)
 
     category_data = category.model_dump(exclude_unset=True)
     if _category_name_changed(category_data, db_category):
@@ -72,17 +97,94 @@ def update_category(category_id: int, category: CategoryUpdate, session: Session
         setattr(db_category, key, value)
 
     session.add(db_category)
-    session.commit()
+    _commit_category(session, db_category.name)
+    # listing search matches category names, so cached counts may be stale
+    transaction_counts.invalidate()
     session.refresh(db_category)
     return db_category
 
 
-@router.delete("/{category_id}")
-def delete_category(category_id: int, session: SessionDep) -> DeleteResponse:
-    db_category = session.get(Category, category_id)
-    if db_category is None:
-        raise HTTPException(status_code=404, detail="Category not found")
+def _delete_category(session: SessionDep, category_id: int) -> None:
+    db_category = _read_category(session, category_id)
 
+    detach_category_spend(session, category_id)
+    track_ledger_change(session, lambda ledger: ledger.uncategorize(category_id))
     session.delete(db_category)
     session.commit()
+    category_snapshots.invalidate()
+    transaction_counts.invalidate()
+
+
+def _upsert_categories(
+    session: SessionDep, categories: list[CategoryCreate]
+) -> list[dict]:
+    rows = upsert_categories(session, categories)
+    session.commit()
+    category_snapshots.invalidate()
+    transaction_counts.invalidate()
+    return sorted((row._asdict() for row in rows), key=lambda row: row["name"])
+
+
+@router.post("/", response_model=CategoryRead, status_code=status.HTTP_201_CREATED)
+async def create_category(category: CategoryCreate, db: DbDep):
+    return await db.run_sync(_create_category, category)
+
+
+@router.get("/", response_model=list[CategoryRead])
+async def read_categories(db: ReadDbDep):
+    categories = await db.run_sync(_read_categories)
+    return FastJSONResponse(categories)
+
+
+@router.get("/export")
+def export_categories(
+    session: ReadSessionDep, format: ColumnarFormat = ColumnarFormat.PARQUET
+):
+    query = select(Category.id, Category.name, Category.budget).order_by(Category.id)
+
+    return StreamingResponse(
+        stream_columnar(session, query, CATEGORY_SCHEMA, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="categories.{format}"'},
+    )
+
+
+@router.get("/{category_id}", response_model=CategoryRead)
+async def read_category(category_id: int, db: DbDep):
+    return await db.run_sync(_read_category, category_id)
+
+
+@router.patch("/{category_id}", response_model=CategoryRead)
+async def update_category(category_id: int, category: CategoryUpdate, db: DbDep):
+    return await db.run_sync(_update_category, category_id, category)
+
+
+@router.delete("/{category_id}")
+async def delete_category(category_id: int, db: DbDep) -> DeleteResponse:
+    await db.run_sync(_delete_category, category_id)
     return DeleteResponse(detail=f"Category with ID {category_id} deleted successfully")
+
+
+@router.put("/by-name", response_model=list[CategoryRead])
+async def upsert_categories_by_name(
+    categories: Annotated[list[CategoryCreate], Body(max_length=UPSERT_MAX_ROWS)],
+    db: DbDep,
+):
+    return await db.run_sync(_upsert_categories, categories)
+
+
+@router.put("/by-name/{category_name}", response_model=CategoryRead)
+async def upsert_category_by_name(
+    category_name: Annotated[str, Path(min_length=1, max_length=25)],
+    category: CategoryUpsert,
+    db: DbDep,
+):
+    try:
+        category_create = CategoryCreate(name=category_name, budget=category.budget)
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("path", "category_name")} for error in e.errors()]
+        )
+
+    rows = await db.run_sync(_upsert_categories, [category_create])
+    return rows[0]
@@ -1,15 +1,44 @@
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal
 from typing import Annotated
 
-from fastapi import APIRouter, Query
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import AfterValidator
-from sqlmodel import case, func, nulls_last, outerjoin, select
 
-from ..dependencies import SessionDep
-from ..helpers import get_month_range, validate_year_month
+from ..aggregates import (
+    AggregateDimension,
+    AggregateMetric,
+    Granularity,
+    aggregate_query,
+)
+from ..cache import get_categories
+from ..dependencies import ReadDbDep, ReadSessionDep, SessionDep
+from ..exporters import (
+    EXPORT_MEDIA_TYPES,
+    MONTHLY_SUMMARY_SCHEMA,
+    ColumnarFormat,
+    stream_columnar,
+)
+from ..helpers import DateRange, get_month_range, validate_year_month
+from ..ledger import epoch_day, get_ledger, month_index
 from ..models import (
-    Category,
+    AggregateRow,
+    BudgetTrend,
+    CategoryStats,
     MonthlySummary,
-    Transaction,
+    TransactionQueryParams,
+)
+from ..queries import budget_trend_query, filter_transactions, monthly_report_query
+from ..responses import FastJSONResponse, rows_payload
+from ..stats import (
+    SpendArrays,
+    category_stats,
+    load_spend_arrays,
+    spend_arrays_query,
 )
 
 router = APIRouter(
@@ -21,41 +50,199 @@ YearMonthParam = Annotated[
     str, Query(pattern=r"\d{4}-\d{2}"), AfterValidator(validate_year_month)
 ]
 
+TREND_MAX_MONTHS = 60
+AGGREGATE_MAX_ROWS = 10_000
+
+
+def _monthly_report(session: SessionDep, month_range: DateRange) -> list:
+    return list(session.exec(monthly_report_query(month_range)).all())
+
 
 @router.get("/monthly_budget", response_model=list[MonthlySummary])
-def get_monthly_report(year_month: YearMonthParam, session: SessionDep):
+async def get_monthly_report(year_month: YearMonthParam, db: ReadDbDep):
     month_range = get_month_range(year_month)
 
-    # subquery to aggregate transactions
-    subq = (
-        select(
-            Transaction.category_id, func.sum(Transaction.amount).label("amount_spent")
-        )
-        .where(
-            Transaction.trans_date >= month_range.start,
-            Transaction.trans_date <= month_range.end,
-        )
-        .group_by(Transaction.category_id)
-        .subquery()
+    data = await db.run_sync(_monthly_report, month_range)
+
+    return FastJSONResponse(rows_payload(data))
+
+
+@router.get("/monthly_budget/export")
+def export_monthly_report(
+    year_month: YearMonthParam,
+    session: ReadSessionDep,
+    format: ColumnarFormat = ColumnarFormat.PARQUET,
+):
+    query = monthly_report_query(get_month_range(year_month))
+    filename = f"monthly_budget_{year_month}.{format}"
+
+    return StreamingResponse(
+        stream_columnar(session, query, MONTHLY_SUMMARY_SCHEMA, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
-    # final query to get category info
-    query = (
-        select(
-            Category.id.label("category_id"),  # ty: ignore[unresolved-attribute]
-            Category.name.label("category_name"),  # ty: ignore[unresolved-attribute]
-            func.coalesce(subq.c.amount_spent, 0).label("amount_spent"),
-            Category.budget,
-        )
-        .select_from(
-            outerjoin(Category, subq, Category.id == subq.c.category_id, full=True)
+
+def _budget_trend(session: SessionDep, start: date, end: date) -> dict:
+    """Shape of `BudgetTrend`; the budget is each category's current one for every month."""
+    months = []
+    month = start
+    while month <= end:
+        months.append(month)
+        month += relativedelta(months=1)
+
+    # rows arrive grouped by category, so the first row of each starts a new matrix row
+    spend_by_category: dict[int | None, dict[date, Decimal]] = {}
+    categories = []
+    for row in session.exec(budget_trend_query(start, end)).all():
+        if row.category_id not in spend_by_category:
+            spend_by_category[row.category_id] = {}
+            categories.append(row)
+        if row.month is not None:
+            spend_by_category[row.category_id][row.month] = row.amount_spent
+
+    matrix = []
+    for category in categories:
+        spend = spend_by_category[category.category_id]
+        cumulative_variance = Decimal(0)
+        cells = []
+        for month in months:
+            amount_spent = spend.get(month, Decimal("0.00"))
+            variance = None
+            if category.budget is not None:
+                variance = category.budget - amount_spent
+                cumulative_variance += variance
+            cells.append(
+                {
+                    "month": month.strftime("%Y-%m"),
+                    "amount_spent": amount_spent,
+                    "variance": variance,
+                    "cumulative_variance": (
+                        cumulative_variance if variance is not None else None
+                    ),
+                }
+            )
+        matrix.append(
+            {
+                "category_id": category.category_id,
+                "category_name": category.category_name,
+                "budget": category.budget,
+                "months": cells,
+            }
         )
-        .order_by(
-            case((Category.budget.is_(None), 1), else_=0),  # ty: ignore[unresolved-attribute]
-            nulls_last(Category.name),
+
+    return {
+        "months": [month.strftime("%Y-%m") for month in months],
+        "categories": matrix,
+    }
+
+
+@router.get("/budget_trend", response_model=BudgetTrend)
+async def get_budget_trend(start: YearMonthParam, end: YearMonthParam, db: ReadDbDep):
+    start_month = get_month_range(start).start
+    end_month = get_month_range(end).start
+
+    if start_month > end_month:
+        raise HTTPException(status_code=400, detail="'start' must not be after 'end'")
+    if start_month + relativedelta(months=TREND_MAX_MONTHS) <= end_month:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Trend cannot span more than {TREND_MAX_MONTHS} months",
         )
+
+    data = await db.run_sync(_budget_trend, start_month, end_month)
+
+    return FastJSONResponse(data)
+
+
+def _aggregate(
+    session: SessionDep,
+    query_params: TransactionQueryParams,
+    group_by: Sequence[AggregateDimension],
+    metrics: Sequence[AggregateMetric],
+    granularity: Granularity,
+    sort: AggregateMetric | None,
+    limit: int,
+) -> list:
+    dialect_name = session.get_bind().dialect.name
+    query = aggregate_query(group_by, metrics, granularity, dialect_name, sort)
+    query, _ = filter_transactions(query, query_params, dialect_name)
+
+    return list(session.exec(query.limit(limit)).all())
+
+
+@router.get("/aggregate", response_model=list[AggregateRow])
+async def get_aggregate(
+    db: ReadDbDep,
+    query_params: Annotated[TransactionQueryParams, Depends()],
+    group_by: Annotated[Sequence[AggregateDimension], Query()] = (),
+    metrics: Annotated[Sequence[AggregateMetric], Query()] = (
+        AggregateMetric.SUM,
+        AggregateMetric.COUNT,
+    ),
+    granularity: Granularity = Granularity.MONTH,
+    sort: Annotated[
+        AggregateMetric | None, Query(description="Metric to order by, largest first")
+    ] = None,
+    limit: Annotated[int, Query(ge=1, le=AGGREGATE_MAX_ROWS)] = AGGREGATE_MAX_ROWS,
+):
+    """
+    Group transactions by any mix of category, vendor, and period (a date bucket
+    of `granularity`) in a single query. Takes the transaction listing filters.
+    """
+    if sort is not None and sort not in metrics:
+        raise HTTPException(status_code=400, detail="'sort' must be one of 'metrics'")
+
+    data = await db.run_sync(
+        _aggregate, query_params, group_by, metrics, granularity, sort, limit
     )
 
-    data = session.exec(query).all()
+    return FastJSONResponse(rows_payload(data))
+
+
+def _ledger_spend_arrays(query_params: TransactionQueryParams) -> SpendArrays | None:
+    """Spend arrays scanned from the ledger snapshot, if loaded; text search needs the database."""
+    ledger = get_ledger()
+    if ledger is None or query_params.q is not None:
+        return None
+
+    columns = ledger.columns()
+    selected = np.ones(len(columns.id), bool)
+    if query_params.start_date is not None:
+        selected &= columns.day >= epoch_day(query_params.start_date)
+    if query_params.end_date is not None:
+        selected &= columns.day <= epoch_day(query_params.end_date)
+
+    return SpendArrays(
+        amount_cents=columns.amount_cents[selected],
+        month_index=month_index(columns.day[selected]),
+        category_id=columns.category_id[selected],
+    )
+
+
+def _category_stats(session: SessionDep, query_params: TransactionQueryParams) -> list:
+    arrays = _ledger_spend_arrays(query_params)
+    if arrays is None:
+        dialect_name = session.get_bind().dialect.name
+        query, _ = filter_transactions(spend_arrays_query(), query_params, dialect_name)
+        arrays = load_spend_arrays(session, query)
+
+    category_names = {
+        category["id"]: category["name"]
+        for category in get_categories(session).categories
+    }
+
+    return category_stats(arrays, category_names)
+
+
+@router.get("/category_stats", response_model=list[CategoryStats])
+async def get_category_stats(
+    db: ReadDbDep, query_params: Annotated[TransactionQueryParams, Depends()]
+):
+    """
+    Distribution of transaction amounts per category, computed with NumPy over
+    the filtered transactions. Takes the transaction listing filters.
+    """
+    data = await db.run_sync(_category_stats, query_params)
 
-    return data
+    return FastJSONResponse(data)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+
+from ..dependencies import (
+    async_engine,
+    async_replica_engine,
+    engine,
+    replica_engine,
+)
+from ..models import PoolStatus
+from ..pool import get_pool_status
+
+router = APIRouter(
+    prefix="/status",
+    tags=["status"],
+)
+
+
+@router.get("/pool", response_model=list[PoolStatus])
+def read_pool_status():
+    statuses = [get_pool_status("sync", engine.pool)]
+    if async_engine is not None:
+        statuses.append(get_pool_status("async", async_engine.sync_engine.pool))
+    if replica_engine is not None:
+        statuses.append(get_pool_status("replica", replica_engine.pool))
+    if async_replica_engine is not None:
+        statuses.append(
+            get_pool_status("async replica", async_replica_engine.sync_engine.pool)
+        )
+    return statuses
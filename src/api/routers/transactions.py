@@ -1,138 +1,356 @@
-import re
+import io
+from collections.abc import Callable
 from datetime import datetime, timezone
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Request, status
-from sqlmodel import or_, select
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Executable, Row, delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import nulls_last, select
+from sqlmodel.sql.expression import SelectOfScalar
 
-from ..dependencies import SessionDep
-from ..helpers import create_page
+from ..cache import transaction_counts
+from ..dependencies import (
+    DbDep,
+    ReadDbDep,
+    ReadSessionDep,
+    SessionDep,
+    reads_from_replica,
+)
+from ..exporters import EXPORT_MEDIA_TYPES, ExportFormat, stream_transactions
+from ..helpers import (
+    count_query_rows,
+    create_keyset_page,
+    create_page,
+    estimate_table_rows,
+    is_foreign_key_violation,
+)
+from ..importers import ImportOptions, ImportResult, import_statement
+from ..ingest import find_missing_categories, insert_transactions
+from ..ledger import track_ledger_change
 from ..models import (
-    Category,
     DeleteResponse,
     PaginationInput,
     Transaction,
+    TransactionBulkResult,
     TransactionCreate,
     TransactionPage,
     TransactionQueryParams,
     TransactionRead,
     TransactionUpdate,
 )
+from ..partitions import ensure_partitions
+from ..queries import (
+    SORT_COLUMNS,
+    TRANSACTION_READ_COLUMNS,
+    filter_transactions,
+    transaction_rows_query,
+)
+from ..responses import (
+    FastJSONResponse,
+    page_payload,
+    transaction_row_payload,
+)
+from ..rollup import SpendDeltas, apply_spend_deltas, spend_deltas
+from ..search import TransactionSort, search_rank
 
 router = APIRouter(
     prefix="/transactions",
     tags=["transactions"],
 )
 
+BULK_MAX_ROWS = 10_000
 
-@router.post("/", response_model=TransactionRead, status_code=status.HTTP_201_CREATED)
-def create_transaction(transaction: TransactionCreate, session: SessionDep):
-    db_transaction = Transaction.model_validate(
-        transaction.model_dump(exclude={"category_id"})
+# the values the monthly spend rollup is keyed and summed by
+ROLLUP_COLUMNS = (Transaction.trans_date, Transaction.amount, Transaction.category_id)
+
+
+def _count_transactions(
+    query: SelectOfScalar,
+    query_map: dict,
+    pagination_input: PaginationInput,
+    session: SessionDep,
+) -> int | None:
+    """Count listed rows from planner statistics or the count cache where possible."""
+    include_total = pagination_input.include_total
+    if include_total is None:
+        include_total = pagination_input.cursor is None
+    if not include_total:
+        return None
+
+    is_filtered = any(value is not None for value in query_map.values())
+    if pagination_input.estimate_total and not is_filtered:
+        estimate = estimate_table_rows(session, Transaction.__tablename__)
+        if estimate is not None:
+            return estimate
+
+    # the count cache is shared with clients pinned to the primary, so a lagging
+    # replica total must neither fill it nor be mixed with cached primary totals
+    if reads_from_replica(session):
+        return count_query_rows(query, session)
+
+    count_key = tuple(sorted(query_map.items()))
+    return transaction_counts.get_or_compute(
+        count_key, lambda: count_query_rows(query, session)
     )
-    if transaction.category_id is not None:
-        category = session.get(Category, transaction.category_id)
-        if category is None:
+
+
+def _write_transaction(
+    session: SessionDep,
+    statement: Executable,
+    rollup_changes: Callable[[Row], SpendDeltas] | None = None,
+    is_delete: bool = False,
+) -> Row | None:
+    """
+    Run a write returning at most one row and commit it, along with the monthly
+    spend rollup changes `rollup_changes` derives from that row. The ledger
+    snapshot follows once the commit succeeds.
+    """
+    try:
+        row = session.execute(statement).one_or_none()
+    except IntegrityError as e:
+        session.rollback()
+        if is_foreign_key_violation(e):
             raise HTTPException(status_code=404, detail="Category not found")
-        db_transaction.category = category
+        raise
 
-    session.add(db_transaction)
+    if row is not None and rollup_changes is not None:
+        apply_spend_deltas(session, rollup_changes(row))
+    if row is not None:
+        if is_delete:
+            track_ledger_change(session, lambda ledger: ledger.delete([row.id]))
+        else:
+            track_ledger_change(session, lambda ledger: ledger.upsert([row._mapping]))
     session.commit()
-    session.refresh(db_transaction)
-    return db_transaction
+    transaction_counts.invalidate()
+    return row
 
 
-@router.get("/", response_model=TransactionPage)
-def read_transactions(
-    request: Request,
+def _get_transaction(session: SessionDep, transaction_id: int) -> dict:
+    row = session.execute(
+        select(*TRANSACTION_READ_COLUMNS).where(Transaction.id == transaction_id)
+    ).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return transaction_row_payload(row)
+
+
+def _create_transaction(session: SessionDep, transaction: TransactionCreate) -> dict:
+    ensure_partitions(session, [transaction.trans_date])
+    statement = (
+        insert(Transaction)
+        .values(**transaction.model_dump())
+        .returning(*TRANSACTION_READ_COLUMNS)
+    )
+    row = _write_transaction(
+        session, statement, lambda row: spend_deltas(added=[row._mapping])
+    )
+    return transaction_row_payload(row)
+
+
+@router.post("/", response_model=TransactionRead, status_code=status.HTTP_201_CREATED)
+async def create_transaction(transaction: TransactionCreate, db: DbDep):
+    return await db.run_sync(_create_transaction, transaction)
+
+
+@router.post(
+    "/bulk",
+    response_model=TransactionBulkResult,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_transactions_bulk(
+    transactions: Annotated[list[TransactionCreate], Body(max_length=BULK_MAX_ROWS)],
     session: SessionDep,
-    pagination_input: Annotated[PaginationInput, Depends()],
-    query_params: Annotated[TransactionQueryParams, Depends()],
 ):
-    query_map: dict = query_params.model_dump()
-
-    # search filter
-    query = select(Transaction)
-    if query_params.q is not None:
-        q = query_params.q.strip().lower()
-        q = re.sub(r"\s+", " ", q)
-        query_map.update({"q": q})
-        search_term = f"%{q}%"
-        query = query.where(
-            or_(
-                Transaction.vendor.ilike(
-                    search_term
-                ),  # ty: ignore[unresolved-attribute]
-                Transaction.note.ilike(search_term),  # ty: ignore[unresolved-attribute]
-                Transaction.category.has(
-                    Category.name.ilike(search_term)
-                ),  # ty: ignore[unresolved-attribute]
+    errors = find_missing_categories(session, transactions)
+    rejected = {error.index for error in errors}
+    valid_transactions = [
+        transaction
+        for index, transaction in enumerate(transactions)
+        if index not in rejected
+    ]
+
+    inserted_count = insert_transactions(session, valid_transactions)
+    session.commit()
+    transaction_counts.invalidate()
+
+    return TransactionBulkResult(inserted_count=inserted_count, errors=errors)
+
+
+@router.post(
+    "/import", response_model=ImportResult, status_code=status.HTTP_201_CREATED
+)
+def import_transactions(
+    file: UploadFile,
+    options: Annotated[ImportOptions, Depends()],
+    session: SessionDep,
+):
+    # uploads are spooled to disk, so the statement is read as a stream
+    stream = io.TextIOWrapper(
+        file.file, encoding="utf-8-sig", errors="replace", newline=""
+    )
+    return import_statement(session, stream, options)
+
+
+def _read_transactions(
+    session: SessionDep,
+    request: Request,
+    pagination_input: PaginationInput,
+    query_params: TransactionQueryParams,
+    sort: TransactionSort,
+):
+    dialect_name = session.get_bind().dialect.name
+    query, query_map = filter_transactions(
+        transaction_rows_query(), query_params, dialect_name
+    )
+
+    total_row_count = _count_transactions(query, query_map, pagination_input, session)
+    query_map.update({"sort": sort})
+
+    # keyset pagination seeks by cursor; sorting is applied with the seek
+    if pagination_input.cursor is not None:
+        if sort == TransactionSort.RELEVANCE:
+            raise HTTPException(
+                status_code=400,
+                detail="Relevance sort does not support cursor pagination",
             )
+        return create_keyset_page(
+            query,
+            SORT_COLUMNS,
+            query_map,
+            pagination_input,
+            session,
+            request,
+            total_row_count,
         )
 
-    # date range filter
-    if query_params.start_date is not None:
-        query = query.where(Transaction.trans_date >= query_params.start_date)
-    if query_params.end_date is not None:
-        query = query.where(Transaction.trans_date <= query_params.end_date)
-
     # sort
-    query = query.order_by(
-        Transaction.trans_date.desc(),  # ty: ignore[unresolved-attribute]
-        Transaction.vendor.desc(),  # ty: ignore[unresolved-attribute]
-        Transaction.amount.desc(),  # ty: ignore[unresolved-attribute]
-    )
+    rank = None
+    if sort == TransactionSort.RELEVANCE and query_map["q"] is not None:
+        rank = search_rank(query_map["q"], dialect_name)
+    if rank is not None:
+        query = query.order_by(nulls_last(rank.desc()))
+    query = query.order_by(*(column.desc() for column in SORT_COLUMNS))
 
-    page_output = create_page(query, query_map, pagination_input, session, request)
+    page_output = create_page(
+        query, query_map, pagination_input, session, request, total_row_count
+    )
 
     return page_output
 
 
-@router.get("/{transaction_id}", response_model=TransactionRead)
-def read_transaction(transaction_id: int, session: SessionDep):
-    transaction = session.get(Transaction, transaction_id)
-    if transaction is None:
-        raise HTTPException(status_code=404, detail="Transaction not found")
-    return transaction
+@router.get("/", response_model=TransactionPage)
+async def read_transactions(
+    request: Request,
+    db: ReadDbDep,
+    pagination_input: Annotated[PaginationInput, Depends()],
+    query_params: Annotated[TransactionQueryParams, Depends()],
+    sort: TransactionSort = TransactionSort.DATE,
+):
+    page = await db.run_sync(
+        _read_transactions, request, pagination_input, query_params, sort
+    )
+    return FastJSONResponse(page_payload(page, transaction_row_payload))
 
 
-@router.patch("/{transaction_id}", response_model=TransactionRead)
-def update_transaction(
-    transaction_id: int, transaction: TransactionUpdate, session: SessionDep
+@router.get("/export")
+def export_transactions(
+    session: ReadSessionDep,
+    query_params: Annotated[TransactionQueryParams, Depends()],
+    format: ExportFormat = ExportFormat.CSV,
 ):
-    db_transaction = session.get(Transaction, transaction_id)
-    if db_transaction is None:
-        raise HTTPException(status_code=404, detail="Transaction not found")
+    query, _ = filter_transactions(
+        transaction_rows_query(), query_params, session.get_bind().dialect.name
+    )
+    query = query.order_by(Transaction.id)
+
+    return StreamingResponse(
+        stream_transactions(session, query, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="transactions.{format}"'
+        },
+    )
+
 
+def _update_transaction(
+    session: SessionDep, transaction_id: int, transaction: TransactionUpdate
+) -> dict:
     transaction_data = transaction.model_dump(exclude_unset=True)
-    for key, value in transaction_data.items():
-        setattr(db_transaction, key, value)
-
-    if (
-        "category_id" in transaction_data
-        and transaction_data["category_id"] is not None
-    ):
-        category = session.get(Category, transaction_data["category_id"])
-        if category is None:
-            raise HTTPException(status_code=404, detail="Category not found")
-        db_transaction.category = category
+    # before the row lock below, which creating a partition would wait for
+    if "trans_date" in transaction_data:
+        ensure_partitions(session, [transaction_data["trans_date"]])
 
-    db_transaction.updated_at = datetime.now(timezone.utc)
+    # the rollup needs the values being replaced, which RETURNING cannot give
+    previous = None
+    if any(column.key in transaction_data for column in ROLLUP_COLUMNS):
+        previous = session.execute(
+            select(*ROLLUP_COLUMNS)
+            .where(Transaction.id == transaction_id)
+            .with_for_update()
+        ).one_or_none()
+        if previous is None:
+            raise HTTPException(status_code=404, detail="Transaction not found")
 
-    session.add(db_transaction)
-    session.commit()
-    session.refresh(db_transaction)
-    return db_transaction
+    def rollup_changes(row: Row) -> SpendDeltas:
+        return spend_deltas(added=[row._mapping], removed=[previous._mapping])
 
+    statement = (
+        update(Transaction)
+        .where(Transaction.id == transaction_id)
+        .values(**transaction_data, updated_at=datetime.now(timezone.utc))
+        .returning(*TRANSACTION_READ_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    row = _write_transaction(
+        session, statement, rollup_changes if previous is not None else None
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return transaction_row_payload(row)
 
-@router.delete("/{transaction_id}")
-def delete_transaction(transaction_id: int, session: SessionDep) -> DeleteResponse:
-    db_transaction = session.get(Transaction, transaction_id)
-    if db_transaction is None:
+
+def _delete_transaction(session: SessionDep, transaction_id: int) -> None:
+    statement = (
+        delete(Transaction)
+        .where(Transaction.id == transaction_id)
+        .returning(Transaction.id, *ROLLUP_COLUMNS)
+        .execution_options(synchronize_session=False)
+    )
+    row = _write_transaction(
+        session,
+        statement,
+        lambda row: spend_deltas(removed=[row._mapping]),
+        is_delete=True,
+    )
+    if row is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
 
-    session.delete(db_transaction)
-    session.commit()
+
+@router.get("/{transaction_id}", response_model=TransactionRead)
+async def read_transaction(transaction_id: int, db: DbDep):
+    return await db.run_sync(_get_transaction, transaction_id)
+
+
+@router.patch("/{transaction_id}", response_model=TransactionRead)
+async def update_transaction(
+    transaction_id: int, transaction: TransactionUpdate, db: DbDep
+):
+    return await db.run_sync(_update_transaction, transaction_id, transaction)
+
+
+@router.delete("/{transaction_id}")
+async def delete_transaction(transaction_id: int, db: DbDep) -> DeleteResponse:
+    await db.run_sync(_delete_transaction, transaction_id)
     return DeleteResponse(
         detail=f"Transaction with ID {transaction_id} deleted successfully"
     )
@@ -0,0 +1,81 @@
+import re
+from enum import StrEnum
+
+from sqlalchemy import ColumnElement
+from sqlmodel import column, func, literal_column, or_, select, table
+
+from .models import Category, Transaction
+
+# trigram indexes cannot narrow down terms shorter than one trigram
+TRIGRAM_MIN_LENGTH = 3
+
+search_table = table("transaction_search", column("rowid"))
+search_table_ref = literal_column("transaction_search")
+
+
+class TransactionSort(StrEnum):
+    DATE = "date"
+    RELEVANCE = "relevance"
+
+
+def normalize_search_term(q: str) -> str:
+    q = q.strip().lower()
+    return re.sub(r"\s+", " ", q)
+
+
+def _fts_phrase(q: str) -> str:
+    """Quote a search term as a single FTS5 phrase."""
+    return '"' + q.replace('"', '""') + '"'
+
+
+def _category_match(search_term: str) -> ColumnElement[bool]:
+    # the category table is small; match its names once rather than per transaction
+    # never correlated, even when the listing joins the category table
+    matching_categories = (
+        select(Category.id)
+        .where(Category.name.ilike(search_term))  # ty: ignore[unresolved-attribute]
+        .correlate(None)
+    )
+    return Transaction.category_id.in_(matching_categories)  # ty: ignore[unresolved-attribute]
+
+
+def search_filter(q: str, dialect_name: str) -> ColumnElement[bool]:
+    """
+    Match transactions whose vendor, note, or category name contains `q`.
+    Postgres answers the `ILIKE` from trigram indexes; SQLite uses the FTS5 table.
+    """
+    search_term = f"%{q}%"
+
+    if dialect_name == "sqlite" and len(q) >= TRIGRAM_MIN_LENGTH:
+        text_match = Transaction.id.in_(  # ty: ignore[unresolved-attribute]
+            select(search_table.c.rowid).where(search_table_ref.match(_fts_phrase(q)))
+        )
+    else:
+        text_match = or_(
+            Transaction.vendor.ilike(search_term),  # ty: ignore[unresolved-attribute]
+            Transaction.note.ilike(search_term),  # ty: ignore[unresolved-attribute]
+        )
+
+    return or_(text_match, _category_match(search_term))
+
+
+def search_rank(q: str, dialect_name: str) -> ColumnElement[float] | None:
+    """Relevance of each transaction to `q`, higher is better; None if unsupported."""
+    if dialect_name == "postgresql":
+        return func.greatest(
+            func.word_similarity(q, Transaction.vendor),
+            func.word_similarity(q, func.coalesce(Transaction.note, "")),
+        )
+
+    if dialect_name == "sqlite" and len(q) >= TRIGRAM_MIN_LENGTH:
+        # bm25 scores improve as they decrease
+        return (
+            select(-func.bm25(search_table_ref))
+            .where(
+                search_table.c.rowid == Transaction.id,
+                search_table_ref.match(_fts_phrase(q)),
+            )
+            .scalar_subquery()
+        )
+
+    return None
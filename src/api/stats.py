@@ -0,0 +1,155 @@
+from collections.abc import Mapping
+from decimal import Decimal
+from itertools import chain
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import Integer, cast, extract
+from sqlmodel import Session, func, select
+from sqlmodel.sql.expression import Select
+
+from .models import Transaction, raw_cents
+
+PERCENTILES = (0.5, 0.9, 0.99)
+# stands in for NULL in the integer category array
+UNCATEGORIZED = -1
+SPEND_LOAD_BATCH_SIZE = 100_000
+
+
+class SpendArrays(NamedTuple):
+    amount_cents: np.ndarray  # int64
+    month_index: np.ndarray  # int64, year * 12 + month - 1
+    category_id: np.ndarray  # int64, UNCATEGORIZED for NULL
+
+
+def spend_arrays_query() -> Select:
+    """Transaction columns as integers, so they load straight into NumPy arrays."""
+    return select(
+        raw_cents(Transaction.amount).label("amount_cents"),
+        cast(
+            extract("year", Transaction.trans_date) * 12
+            + extract("month", Transaction.trans_date)
+            - 1,
+            Integer,
+        ).label("month_index"),
+        func.coalesce(Transaction.category_id, UNCATEGORIZED).label("category_id"),
+    )
+
+
+def load_spend_arrays(session: Session, query: Select) -> SpendArrays:
+    """
+    Run a query selecting the three `spend_arrays_query` columns into arrays.
+    Rows are streamed in batches into arrays with spare capacity, so only one
+    batch is ever held as Python objects.
+    """
+    result = session.execute(query.execution_options(yield_per=SPEND_LOAD_BATCH_SIZE))
+    columns = np.empty((3, 0), np.int64)
+    size = 0
+    for batch in result.partitions():
+        end = size + len(batch)
+        if end > columns.shape[1]:
+            grown = np.empty((3, max(end, columns.shape[1] * 2)), np.int64)
+            grown[:, :size] = columns[:, :size]
+            columns = grown
+        # flattened without building per-row Python objects in NumPy
+        values = np.fromiter(
+            chain.from_iterable(batch), dtype=np.int64, count=len(batch) * 3
+        )
+        columns[:, size:end] = values.reshape(len(batch), 3).T
+        size = end
+    return SpendArrays(*columns[:, :size])
+
+
+def _cents(value: float) -> Decimal:
+    return Decimal(round(value)).scaleb(-2)
+
+
+def category_stats(
+    arrays: SpendArrays, category_names: Mapping[int, str]
+) -> list[dict]:
+    """
+    Per-category count, total, mean, standard deviation, percentiles, and the
+    latest month's growth over the month before it.
+    Each statistic is one vectorized pass over all categories at once: sums are
+    binned by category, and percentiles read from a single sort of amounts keyed
+    by category, in which each category is one contiguous run.
+    """
+    if not len(arrays.amount_cents):
+        return []
+
+    # category ids are small integers, so they index bins directly
+    category_codes = arrays.category_id - UNCATEGORIZED
+    counts_by_code = np.bincount(category_codes)
+    category_ids = np.flatnonzero(counts_by_code)
+    counts = counts_by_code[category_ids]
+    group_by_code = np.cumsum(counts_by_code > 0) - 1
+    group = group_by_code[category_codes]
+    group_count = len(category_ids)
+
+    amounts = arrays.amount_cents
+    totals = np.bincount(group, weights=amounts, minlength=group_count)
+    means = totals / counts
+    deviations = amounts - means[group]
+    stds = np.sqrt(
+        np.bincount(group, weights=deviations * deviations, minlength=group_count)
+        / counts
+    )
+
+    # one sort of (group, amount) packed into a single integer key
+    low = amounts.min()
+    span = amounts.max() - low + 1
+    sorted_amounts = np.sort(group * span + (amounts - low)) % span + low
+    starts = np.cumsum(counts) - counts
+
+    # linear interpolation between closest ranks, as `np.percentile` does
+    percentiles = {}
+    for p in PERCENTILES:
+        position = (counts - 1) * p
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        low_values = sorted_amounts[starts + lower]
+        high_values = sorted_amounts[starts + upper]
+        percentiles[p] = low_values + (high_values - low_values) * (position - lower)
+
+    # monthly totals as a category x month matrix covering the whole range
+    months = arrays.month_index
+    first_month, last_month = months.min(), months.max()
+    month_count = last_month - first_month + 1
+    monthly = np.bincount(
+        group * month_count + (months - first_month),
+        weights=amounts,
+        minlength=group_count * month_count,
+    ).reshape(group_count, month_count)
+    latest = monthly[:, -1]
+    previous = monthly[:, -2] if month_count > 1 else np.zeros_like(latest)
+
+    year, month = divmod(int(last_month), 12)
+    latest_month = f"{year:04d}-{month + 1:02d}"
+
+    stats = []
+    for i, category_id in enumerate((category_ids + UNCATEGORIZED).tolist()):
+        if category_id == UNCATEGORIZED:
+            category_id = None
+        stats.append(
+            {
+                "category_id": category_id,
+                "category_name": category_names.get(category_id),
+                "count": int(counts[i]),
+                "total": _cents(totals[i]),
+                "mean": _cents(means[i]),
+                "std": _cents(stds[i]),
+                "p50": _cents(percentiles[0.5][i]),
+                "p90": _cents(percentiles[0.9][i]),
+                "p99": _cents(percentiles[0.99][i]),
+                "latest_month": latest_month,
+                "latest_month_total": _cents(latest[i]),
+                "previous_month_total": _cents(previous[i]),
+                "month_over_month_growth": (
+                    round(float(latest[i] / previous[i] - 1), 4)
+                    if previous[i]
+                    else None
+                ),
+            }
+        )
+
+    return stats
@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 from datetime import date
+from decimal import Decimal
 
 import httpx
 from dateutil.relativedelta import relativedelta
@@ -7,6 +8,8 @@ from decouple import config
 from nicegui import ui
 
 API_BASE_URL = config("API_BASE_URL")
+# keeps the API's cookies, so reads right after a write are served from the primary
+api_client = httpx.Client()
 
 
 @dataclass
@@ -29,13 +32,13 @@ def call_api(
     try:
         match method:
             case "GET":
-                response = httpx.get(url, params=payload)
+                response = api_client.get(url, params=payload)
             case "POST":
-                response = httpx.post(url, json=payload)
+                response = api_client.post(url, json=payload)
             case "PATCH":
-                response = httpx.patch(url, json=payload)
+                response = api_client.patch(url, json=payload)
             case "DELETE":
-                response = httpx.delete(url)
+                response = api_client.delete(url)
             case _:
                 raise ValueError(f"Unsupported HTTP method: {method}")
         response.raise_for_status()
@@ -52,13 +55,24 @@ def call_api(
 def format_currency(amount: str | None) -> str:
     if amount is None:
         return "--"
-    return f"${float(amount):,.2f}"
+    # amounts arrive as exact decimal strings; floats would round them
+    return f"${Decimal(amount):,.2f}"
 
 
-def currency_str_to_float(amount: str | None) -> float:
+def parse_currency(amount: str | None) -> Decimal:
     if amount is None:
-        return 0.0
-    return float(amount)
+        return Decimal(0)
+    return Decimal(amount)
+
+
+def currency_payload(value: float | None) -> str | None:
+    """
+    Turn a number input's float into the exact decimal string the API takes.
+    The input only holds what was typed, so its shortest repr is that text.
+    """
+    if value is None:
+        return None
+    return str(Decimal(repr(value)).quantize(Decimal("0.01")))
 
 
 def get_selectable_categories() -> dict[str, str]:
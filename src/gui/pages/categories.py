@@ -1,6 +1,11 @@
 from nicegui import ui
 
-from ..helpers import call_api, currency_str_to_float, format_currency
+from ..helpers import (
+    call_api,
+    currency_payload,
+    format_currency,
+    parse_currency,
+)
 from ..theme import theme
 
 
@@ -56,7 +61,7 @@ def create() -> None:
                     dialog.open()
 
             def submit_create(dialog, name, budget):
-                payload = {"name": name, "budget": budget}
+                payload = {"name": name, "budget": currency_payload(budget)}
                 result = call_api("/categories/", payload=payload, method="POST")
                 if result.success:
                     dialog.close()
@@ -69,7 +74,7 @@ def create() -> None:
 
                     name = ui.input("Name", value=row["name"]).classes("w-full")
                     budget = ui.number(
-                        "Budget", value=currency_str_to_float(row["budget"])
+                        "Budget", value=float(parse_currency(row["budget"]))
                     ).classes("w-full")
 
                     with ui.row():
@@ -84,7 +89,7 @@ def create() -> None:
                     dialog.open()
 
             def submit_edit(dialog, id, name, budget):
-                payload = {"name": name, "budget": budget}
+                payload = {"name": name, "budget": currency_payload(budget)}
                 result = call_api(f"/categories/{id}", payload=payload, method="PATCH")
                 if result.success:
                     dialog.close()
@@ -3,7 +3,7 @@ from datetime import date
 import plotly.graph_objects as go
 from nicegui import ui
 
-from ..helpers import call_api, currency_str_to_float, get_month_options
+from ..helpers import call_api, get_month_options, parse_currency
 from ..theme import theme
 
 
@@ -21,8 +21,8 @@ def create() -> None:
                 budget_str: str,
                 y_domain: list[float],
             ):
-                value = currency_str_to_float(value_str)
-                budget = currency_str_to_float(budget_str)
+                value = parse_currency(value_str)
+                budget = parse_currency(budget_str)
                 is_under = value <= budget
                 bar_color = mint_green if is_under else mint_red
 
@@ -38,7 +38,8 @@ def create() -> None:
                 fig.add_trace(
                     go.Indicator(
                         mode="gauge+number",
-                        value=value,
+                        # plotly only draws floats; the math above stays exact
+                        value=float(value),
                         domain={"x": [0.2, 1], "y": y_domain},
                         title={
                             "text": f"<b>{title}</b><br><span style='color: gray; font-size:0.8em'>{delta_text}</span>",
@@ -49,7 +50,7 @@ def create() -> None:
                             "axis": {
                                 "range": [
                                     0.0,
-                                    max(value, budget, 1),
+                                    float(max(value, budget, 1)),
                                 ],  # max must be at least 1 for proper rendering
                                 "visible": False,
                             },
@@ -4,9 +4,10 @@ from nicegui import ui
 
 from ..helpers import (
     call_api,
-    currency_str_to_float,
+    currency_payload,
     format_currency,
     get_selectable_categories,
+    parse_currency,
 )
 from ..theme import theme
 
@@ -166,7 +167,7 @@ def create() -> None:
                                 vendor=vendor.value,
                                 trans_date=date.value,
                                 note=note.value,
-                                amount=amount.value,
+                                amount=currency_payload(amount.value),
                                 category_id=category_id.value,
                             ),
                         )
@@ -203,7 +204,7 @@ def create() -> None:
                                 )
 
                         amount = ui.number(
-                            "Amount", value=currency_str_to_float(row["amount"])
+                            "Amount", value=float(parse_currency(row["amount"]))
                         ).classes("w-4/10")
                     with ui.row().classes("justify-between"):
                         vendor = ui.input("Vendor", value=row["vendor"]).classes(
@@ -232,7 +233,7 @@ def create() -> None:
                                 vendor=vendor.value,
                                 trans_date=date.value,
                                 note=note.value,
-                                amount=amount.value,
+                                amount=currency_payload(amount.value),
                                 category_id=category_id.value,
                             ),
                         )
@@ -1,11 +1,32 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from src.api.dependencies import Session, create_engine, get_session
+from src.api.cache import category_snapshots, transaction_counts
+from src.api.dependencies import (
+    Session,
+    create_engine,
+    get_async_url,
+    get_db,
+    get_read_db,
+    get_read_session,
+    get_session,
+)
+from src.api.ledger import transaction_ledger
 from src.api.main import app
 from src.api.models import SQLModel
 
 
+@pytest.fixture(autouse=True)
+def reset_caches():
+    # process-wide caches would otherwise leak rows between test databases
+    category_snapshots.invalidate()
+    transaction_counts.invalidate()
+    transaction_ledger.reset()
+
+
 @pytest.fixture(scope="function")
 def db_engine(tmp_path):
     db_path = tmp_path / "test.db"
@@ -29,6 +50,27 @@ def test_client(test_session: Session):
         return test_session
 
     app.dependency_overrides[get_session] = get_test_session
+    app.dependency_overrides[get_read_session] = get_test_session
+    client = TestClient(app)
+
+    yield client
+
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="async_client", scope="function")
+def test_async_client(db_engine):
+    """Client whose routes run on an async engine over the same test database."""
+    async_engine = create_async_engine(
+        get_async_url(str(db_engine.url)), poolclass=NullPool
+    )
+
+    async def get_test_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_test_db
+    app.dependency_overrides[get_read_db] = get_test_db
     client = TestClient(app)
 
     yield client
@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+
+
+def test_async_category_crud(async_client: TestClient):
+    response = async_client.post(
+        "/categories", json={"name": "Utilities", "budget": 200.00}
+    )
+    assert response.status_code == 201
+    category_id = response.json()["id"]
+
+    response = async_client.patch(f"/categories/{category_id}", json={"budget": 250})
+    assert response.status_code == 200
+    assert response.json()["budget"] == "250.00"
+
+    response = async_client.get("/categories")
+    assert [category["name"] for category in response.json()] == ["Utilities"]
+
+    response = async_client.delete(f"/categories/{category_id}")
+    assert response.status_code == 200
+    assert async_client.get(f"/categories/{category_id}").status_code == 404
+
+
+def test_async_transaction_crud(async_client: TestClient):
+    async_client.post("/categories", json={"name": "Utilities", "budget": 200.00})
+    response = async_client.post(
+        "/transactions",
+        json={
+            "trans_date": "2024-07-14",
+            "amount": 54.99,
+            "vendor": "AT&T",
+            "category_id": 1,
+        },
+    )
+    assert response.status_code == 201
+    assert response.json()["category"]["name"] == "Utilities"
+
+    response = async_client.post(
+        "/transactions",
+        json={"trans_date": "2024-07-15", "amount": 12.50, "vendor": "Kroger"},
+    )
+    assert response.status_code == 201
+    assert response.json()["category"] is None
+
+    response = async_client.patch("/transactions/2", json={"category_id": 1})
+    assert response.status_code == 200
+    assert response.json()["category"]["id"] == 1
+    assert response.json()["updated_at"] is not None
+
+    response = async_client.get("/transactions", params={"q": "kroger"})
+    data = response.json()
+    assert data["total_row_count"] == 1
+    assert data["data"][0]["category"]["name"] == "Utilities"
+
+    response = async_client.delete("/transactions/1")
+    assert response.status_code == 200
+    assert async_client.get("/transactions/1").status_code == 404
+
+
+def test_async_transaction_category_not_found(async_client: TestClient):
+    response = async_client.post(
+        "/transactions",
+        json={
+            "trans_date": "2024-07-14",
+            "amount": 54.99,
+            "vendor": "AT&T",
+            "category_id": 99,
+        },
+    )
+    assert response.status_code == 404
+
+
+def test_async_monthly_report(async_client: TestClient):
+    async_client.post("/categories", json={"name": "Utilities", "budget": 200.00})
+    async_client.post(
+        "/transactions",
+        json={
+            "trans_date": "2024-07-14",
+            "amount": 54.99,
+            "vendor": "AT&T",
+            "category_id": 1,
+        },
+    )
+
+    response = async_client.get(
+        "/reports/monthly_budget", params={"year_month": "2024-07"}
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["amount_spent"] == "54.99"
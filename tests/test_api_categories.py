@@ -1,5 +1,12 @@
+import io
+from decimal import Decimal
+
+import pyarrow.parquet as pq
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from src.api.models import Category
 
 
 @pytest.fixture()
@@ -108,6 +115,36 @@ def test_get_categories(client: TestClient, add_category, add_another_category):
     assert len(data) == 2
 
 
+def test_get_categories_cached(client: TestClient, db_engine, add_category):
+    statements = []
+    event.listen(
+        db_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    client.get("/categories")
+    client.get("/categories")
+    assert len(statements) == 1
+
+    # writes invalidate the cache
+    client.post("/categories", json={"name": "Travel"})
+    response = client.get("/categories")
+    assert [category["name"] for category in response.json()] == [
+        "Travel",
+        "Utilities",
+    ]
+
+
+def test_get_categories_matches_single_read(
+    client: TestClient, add_category, add_another_category
+):
+    data = client.get("/categories").json()
+
+    assert data[0] == client.get("/categories/2").json()
+    assert data[1] == client.get("/categories/1").json()
+
+
 def test_get_category(client: TestClient, add_category):
     response = client.get("/categories/1")
     data = response.json()
@@ -210,3 +247,77 @@ def test_delete_category_not_found(client: TestClient):
 
     assert response.status_code == 404
     assert data["detail"] == "Category not found"
+
+
+def test_upsert_category_by_name_creates(client: TestClient):
+    response = client.put("/categories/by-name/travel", json={"budget": 75})
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["id"] == 1
+    assert data["name"] == "Travel"
+    assert data["budget"] == "75.00"
+
+
+def test_upsert_category_by_name_updates(client: TestClient, add_category):
+    response = client.put("/categories/by-name/UTILITIES", json={"budget": 250})
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["id"] == 1
+    assert data["name"] == "Utilities"
+    assert data["budget"] == "250.00"
+    assert len(client.get("/categories").json()) == 1
+
+
+def test_upsert_category_by_name_422_blank_name(client: TestClient):
+    response = client.put("/categories/by-name/%20", json={})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["path", "category_name"]
+
+
+def test_upsert_categories_by_name(client: TestClient, add_category):
+    payload = [
+        {"name": "travel", "budget": 75},
+        {"name": "utilities", "budget": 300},
+        {"name": "Travel", "budget": 80},
+    ]
+    response = client.put("/categories/by-name", json=payload)
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [(c["id"], c["name"], c["budget"]) for c in data] == [
+        (2, "Travel", "80.00"),
+        (1, "Utilities", "300.00"),
+    ]
+
+
+def test_create_duplicate_category_not_yet_cached(
+    client: TestClient, test_session, add_category
+):
+    client.get("/categories")
+    test_session.add(Category(name="Travel"))
+    test_session.commit()
+
+    # the cached list predates the insert, so the unique index catches the duplicate
+    response = client.post("/categories", json={"name": "travel"})
+
+    assert response.status_code == 409
+    assert (
+        response.json()["detail"] == "Category with name 'Travel' already exists (ID 2)"
+    )
+
+
+def test_export_categories_parquet(client: TestClient):
+    client.post("/categories", json={"name": "Utilities", "budget": 200.00})
+    client.post("/categories", json={"name": "Travel"})
+
+    response = client.get("/categories/export")
+    table = pq.read_table(io.BytesIO(response.content))
+
+    assert response.status_code == 200
+    assert table.to_pylist() == [
+        {"id": 1, "name": "Utilities", "budget": Decimal("200.00")},
+        {"id": 2, "name": "Travel", "budget": None},
+    ]
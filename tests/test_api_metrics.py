@@ -0,0 +1,70 @@
+import time
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlmodel import func, select
+
+
+def _sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_timed_by_route(client: TestClient):
+    labels = {"method": "GET", "route": "/categories/{category_id}"}
+    count = _sample("http_request_duration_seconds_count", **labels)
+    not_found = _sample("http_requests_total", **labels, status="404")
+    statements = _sample("http_request_db_statements_sum", **labels)
+
+    response = client.get("/categories/42")
+    assert response.status_code == 404
+
+    assert _sample("http_request_duration_seconds_count", **labels) == count + 1
+    assert _sample("http_requests_total", **labels, status="404") == not_found + 1
+    assert _sample("http_request_db_statements_sum", **labels) > statements
+
+
+def test_db_statements_counted_on_async_sessions(async_client: TestClient):
+    labels = {"method": "GET", "route": "/transactions/{transaction_id}"}
+    statements = _sample("http_request_db_statements_sum", **labels)
+
+    async_client.get("/transactions/1")
+
+    assert _sample("http_request_db_statements_sum", **labels) == statements + 1
+
+
+def test_unmatched_paths_share_one_label(client: TestClient):
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    count = _sample("http_requests_total", **labels)
+
+    client.get("/no/such/path")
+    client.get("/another/missing/path")
+
+    assert _sample("http_requests_total", **labels) == count + 2
+
+
+def test_metrics_exposed_as_prometheus_text(client: TestClient):
+    client.get("/")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_requests_in_flight" in response.text
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in response.text
+
+
+def test_streamed_exports_timed_until_the_body_is_sent(client: TestClient, monkeypatch):
+    def slow_stream(session, query, export_format):
+        # the route has returned by the time the body is streamed
+        yield "id\n"
+        time.sleep(0.2)
+        yield f"{session.exec(select(func.count())).one()}\n"
+
+    monkeypatch.setattr("src.api.routers.transactions.stream_transactions", slow_stream)
+    labels = {"method": "GET", "route": "/transactions/export"}
+    seconds = _sample("http_request_duration_seconds_sum", **labels)
+    statements = _sample("http_request_db_statements_sum", **labels)
+
+    assert client.get("/transactions/export").text == "id\n1\n"
+
+    assert _sample("http_request_duration_seconds_sum", **labels) >= seconds + 0.2
+    assert _sample("http_request_db_statements_sum", **labels) == statements + 1
@@ -1,3 +1,10 @@
+import io
+import statistics
+from decimal import Decimal
+
+import numpy
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 from fastapi.testclient import TestClient
 
@@ -93,3 +100,223 @@ def test_get_month_report_422_bad_param(
     assert response.status_code == 422
     assert data["detail"][0]["type"] == expected_error_type
     assert expected_msg in data["detail"][0]["msg"]
+
+
+def test_get_budget_trend(client: TestClient, add_transactions):
+    client.post("/categories", json={"name": "Rent", "budget": 1000.00})
+
+    response = client.get("/reports/budget_trend?start=2025-06&end=2025-08")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["months"] == ["2025-06", "2025-07", "2025-08"]
+    assert [row["category_name"] for row in data["categories"]] == [
+        "Rent",
+        "Utilities",
+        "Travel",
+        None,
+    ]
+
+    rent = data["categories"][0]
+    assert [cell["amount_spent"] for cell in rent["months"]] == ["0.00"] * 3
+    assert rent["months"][2]["cumulative_variance"] == "3000.00"
+
+    utilities = data["categories"][1]
+    assert utilities["budget"] == "200.00"
+    assert utilities["months"][0] == {
+        "month": "2025-06",
+        "amount_spent": "0.00",
+        "variance": "200.00",
+        "cumulative_variance": "200.00",
+    }
+    assert utilities["months"][1]["amount_spent"] == "51.00"
+    assert utilities["months"][1]["variance"] == "149.00"
+    assert utilities["months"][1]["cumulative_variance"] == "349.00"
+
+    travel = data["categories"][2]
+    assert travel["months"][1]["amount_spent"] == "15.00"
+    assert travel["months"][1]["variance"] is None
+    assert travel["months"][1]["cumulative_variance"] is None
+
+    uncategorized = data["categories"][3]
+    assert [cell["amount_spent"] for cell in uncategorized["months"]] == [
+        "25.00",
+        "25.00",
+        "0.00",
+    ]
+
+
+def test_get_budget_trend_matches_monthly_reports(client: TestClient, add_transactions):
+    trend = client.get("/reports/budget_trend?start=2025-06&end=2025-07").json()
+
+    for index, month in enumerate(trend["months"]):
+        report = client.get(f"/reports/monthly_budget?year_month={month}").json()
+        spend = {row["category_id"]: row["amount_spent"] for row in report}
+        for row in trend["categories"]:
+            assert spend[row["category_id"]] == row["months"][index]["amount_spent"]
+
+
+@pytest.mark.parametrize(
+    "query,expected_msg",
+    [
+        ("start=2025-07&end=2025-06", "must not be after"),
+        ("start=2015-01&end=2025-01", "more than 60 months"),
+    ],
+)
+def test_get_budget_trend_400_bad_range(client: TestClient, query, expected_msg):
+    response = client.get(f"/reports/budget_trend?{query}")
+
+    assert response.status_code == 400
+    assert expected_msg in response.json()["detail"]
+
+
+def test_get_aggregate_totals(client: TestClient, add_transactions):
+    response = client.get("/reports/aggregate")
+
+    assert response.status_code == 200
+    assert response.json() == [{"sum": "116.00", "count": 5}]
+
+
+def test_get_aggregate_by_category_and_month(client: TestClient, add_transactions):
+    query = "group_by=category&group_by=period&metrics=sum&metrics=avg&metrics=max"
+    response = client.get(f"/reports/aggregate?{query}")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data[0] == {
+        "category_id": 1,
+        "category_name": "Utilities",
+        "period": "2025-07-01",
+        "sum": "51.00",
+        "avg": "25.50",
+        "max": "50.99",
+    }
+    assert [(row["category_id"], row["period"]) for row in data] == [
+        (1, "2025-07-01"),
+        (2, "2025-07-01"),
+        (None, "2025-06-01"),
+        (None, "2025-07-01"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "granularity,expected_periods",
+    [
+        ("day", ["2025-06-02", "2025-07-01", "2025-07-14", "2025-07-31"]),
+        ("week", ["2025-06-02", "2025-06-30", "2025-07-14", "2025-07-28"]),
+        ("month", ["2025-06-01", "2025-07-01"]),
+        ("quarter", ["2025-04-01", "2025-07-01"]),
+        ("year", ["2025-01-01"]),
+    ],
+)
+def test_get_aggregate_granularity(
+    client: TestClient, add_transactions, granularity, expected_periods
+):
+    url = f"/reports/aggregate?group_by=period&granularity={granularity}"
+    data = client.get(url).json()
+
+    assert [row["period"] for row in data] == expected_periods
+    assert sum(row["count"] for row in data) == 5
+
+
+def test_get_aggregate_filtered_and_sorted(client: TestClient, add_transactions):
+    query = "group_by=vendor&metrics=sum&sort=sum&start_date=2025-07-01&limit=2"
+    data = client.get(f"/reports/aggregate?{query}").json()
+
+    assert data == [
+        {"vendor": "AT&T", "sum": "51.00"},
+        {"vendor": "Amazon", "sum": "25.00"},
+    ]
+
+    data = client.get("/reports/aggregate?group_by=vendor&q=expedia").json()
+
+    assert data == [{"vendor": "Expedia", "sum": "15.00", "count": 1}]
+
+
+def test_get_aggregate_400_sort_not_requested(client: TestClient):
+    response = client.get("/reports/aggregate?metrics=count&sort=sum")
+
+    assert response.status_code == 400
+
+
+def test_get_category_stats(client: TestClient, add_transactions):
+    client.post(
+        "/transactions",
+        json={
+            "trans_date": "2025-06-20",
+            "amount": 30.00,
+            "vendor": "AT&T",
+            "category_id": 1,
+        },
+    )
+
+    response = client.get("/reports/category_stats")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [row["category_name"] for row in data] == [None, "Utilities", "Travel"]
+
+    utilities = data[1]
+    assert utilities["count"] == 3
+    assert utilities["total"] == "81.00"
+    assert utilities["mean"] == "27.00"
+    assert utilities["std"] == str(
+        round(Decimal(statistics.pstdev([50.99, 0.01, 30.00])), 2)
+    )
+    assert utilities["p50"] == "30.00"
+    assert utilities["p90"] == str(
+        round(Decimal(float(numpy.percentile([50.99, 0.01, 30.00], 90))), 2)
+    )
+    assert utilities["latest_month"] == "2025-07"
+    assert utilities["latest_month_total"] == "51.00"
+    assert utilities["previous_month_total"] == "30.00"
+    assert utilities["month_over_month_growth"] == 0.7
+
+    uncategorized = data[0]
+    assert uncategorized["month_over_month_growth"] == 0.0
+
+    travel = data[2]
+    assert travel["std"] == "0.00"
+    assert travel["p99"] == "15.00"
+    assert travel["month_over_month_growth"] is None
+
+
+def test_get_category_stats_filtered(client: TestClient, add_transactions):
+    data = client.get("/reports/category_stats?end_date=2025-06-30").json()
+
+    assert len(data) == 1
+    assert data[0]["category_id"] is None
+    assert data[0]["latest_month"] == "2025-06"
+
+    assert client.get("/reports/category_stats?q=nothing").json() == []
+
+
+def test_get_category_stats_loaded_in_batches(
+    client: TestClient, add_transactions, monkeypatch
+):
+    expected = client.get("/reports/category_stats").json()
+
+    # fewer rows per batch than transactions, so the arrays grow between batches
+    monkeypatch.setattr("src.api.stats.SPEND_LOAD_BATCH_SIZE", 2)
+    assert client.get("/reports/category_stats").json() == expected
+
+
+@pytest.mark.parametrize("export_format", ["arrow", "parquet"])
+def test_export_monthly_report(client: TestClient, add_transactions, export_format):
+    url = f"/reports/monthly_budget/export?year_month=2025-07&format={export_format}"
+    response = client.get(url)
+
+    if export_format == "arrow":
+        table = pa.ipc.open_stream(response.content).read_all()
+    else:
+        table = pq.read_table(io.BytesIO(response.content))
+
+    report = client.get("/reports/monthly_budget?year_month=2025-07").json()
+
+    assert response.status_code == 200
+    assert (
+        'filename="monthly_budget_2025-07.' in response.headers["content-disposition"]
+    )
+    assert [str(amount) for amount in table.column("amount_spent").to_pylist()] == [
+        row["amount_spent"] for row in report
+    ]
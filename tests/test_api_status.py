@@ -0,0 +1,10 @@
+from fastapi.testclient import TestClient
+
+
+def test_read_pool_status(client: TestClient):
+    response = client.get("/status/pool")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data[0]["engine"] == "sync"
+    assert data[0]["pool_class"] is not None
@@ -1,5 +1,12 @@
+import io
+import json
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event, text
 
 from src.api.helpers import generate_url_query
 
@@ -69,6 +76,22 @@ def test_create_another_transaction(
     assert data["created_at"] is not None
 
 
+def test_amounts_stored_as_integer_cents(client: TestClient, test_session):
+    for amount in [0.1, 0.2, "1234567.89"]:
+        client.post(
+            "/transactions",
+            json={"trans_date": "2025-11-02", "amount": amount, "vendor": "Kroger"},
+        )
+
+    stored = test_session.execute(
+        text('SELECT amount, typeof(amount) FROM "transaction" ORDER BY id')
+    ).all()
+    response = client.get("/reports/aggregate?metrics=sum&metrics=avg")
+
+    assert stored == [(10, "integer"), (20, "integer"), (123456789, "integer")]
+    assert response.json() == [{"sum": "1234568.19", "avg": "411522.73"}]
+
+
 def test_create_transaction_invalid_category(client: TestClient):
     payload = {
         "trans_date": "2025-11-02",
@@ -186,6 +209,18 @@ def test_get_transactions(client: TestClient, add_transaction, add_another_trans
     assert data[1]["trans_date"] == "2024-07-14"
 
 
+def test_get_transactions_matches_single_read(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    client.patch("/transactions/2", json={"note": "Groceries"})
+
+    data = client.get("/transactions").json()["data"]
+
+    # listings skip response validation, so their JSON must match the validated route
+    assert data[0] == client.get("/transactions/2").json()
+    assert data[1] == client.get("/transactions/1").json()
+
+
 @pytest.mark.parametrize(
     "term,expected_count",
     [("Utilities", 1), ("%20%20KrOgER%20", 1), ("DoesNotExist", 0)],
@@ -323,3 +358,317 @@ def test_delete_transaction_not_found(client: TestClient):
 
     assert response.status_code == 404
     assert data["detail"] == "Transaction not found"
+
+
+def test_transaction_writes_use_one_statement(
+    client: TestClient, db_engine, add_category
+):
+    statements = []
+    event.listen(
+        db_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    def transaction_statements():
+        # the monthly spend rollup adds its own upsert alongside each write
+        return [s for s in statements if "monthly_spend" not in s]
+
+    payload = {
+        "trans_date": "2024-07-14",
+        "amount": 54.99,
+        "vendor": "AT&T",
+        "category_id": 1,
+    }
+    response = client.post("/transactions", json=payload)
+    assert response.json()["category"]["name"] == "Utilities"
+    assert len(transaction_statements()) == 1
+
+    response = client.patch("/transactions/1", json={"note": "Fiber Internet"})
+    assert response.json()["category"]["name"] == "Utilities"
+    assert len(transaction_statements()) == 2
+
+    client.delete("/transactions/1")
+    assert len(transaction_statements()) == 3
+
+
+def test_get_transactions_single_query(
+    client: TestClient, db_engine, add_transaction, add_another_transaction
+):
+    statements = []
+    event.listen(
+        db_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    response = client.get("/transactions?include_total=false")
+    data = response.json()["data"]
+
+    # rows carry the category name, so no relationship load follows the page
+    assert len(statements) == 1
+    assert data[1]["category"] == {"id": 1, "name": "Utilities"}
+    assert data[0]["category"] is None
+
+
+def test_get_transactions_keyset_pagination(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    response = client.get("/transactions/?cursor=&size=1")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert len(data["data"]) == 1
+    assert data["data"][0]["trans_date"] == "2025-11-02"
+    assert data["total_row_count"] is None
+    assert data["links"]["prev"] is None
+    assert data["links"]["next_cursor"] is not None
+
+    # check next page
+    response = client.get(data["links"]["next"])
+    data = response.json()
+    assert len(data["data"]) == 1
+    assert data["data"][0]["trans_date"] == "2024-07-14"
+    assert data["links"]["next"] is None
+    assert data["links"]["prev"] is not None
+
+    # walk back to first page
+    response = client.get(data["links"]["prev"])
+    data = response.json()
+    assert len(data["data"]) == 1
+    assert data["data"][0]["trans_date"] == "2025-11-02"
+    assert data["links"]["prev"] is None
+    assert data["links"]["next"] is not None
+
+
+def test_get_transactions_keyset_pagination_long_vendor(client: TestClient):
+    # the longest vendors give the longest cursors
+    for vendor in ("Д" * 25, "\x01" * 25):
+        client.post(
+            "/transactions",
+            json={"trans_date": "2025-07-14", "amount": 99999999.99, "vendor": vendor},
+        )
+
+    data = client.get("/transactions/?cursor=&size=1").json()
+    response = client.get(data["links"]["next"])
+
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 1
+
+
+def test_get_transactions_keyset_pagination_invalid_cursor(client: TestClient):
+    response = client.get("/transactions/?cursor=notacursor")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_get_transactions_without_total(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    response = client.get("/transactions/?page=1&size=1&include_total=false")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert len(data["data"]) == 1
+    assert data["total_row_count"] is None
+    assert data["total_page_count"] is None
+    assert data["links"]["next"] is not None
+
+    response = client.get(data["links"]["next"])
+    data = response.json()
+    assert len(data["data"]) == 1
+    assert data["links"]["next"] is None
+    assert data["links"]["prev"] is not None
+
+
+def test_get_transactions_estimate_total_falls_back_to_count(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    response = client.get("/transactions/?estimate_total=true")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert data["total_row_count"] == 2
+
+
+def test_get_transactions_count_cache_invalidated_on_write(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    response = client.get("/transactions/")
+    assert response.json()["total_row_count"] == 2
+
+    client.delete("/transactions/1")
+
+    response = client.get("/transactions/")
+    assert response.json()["total_row_count"] == 1
+
+
+def test_create_transactions_bulk(client: TestClient, add_category):
+    payload = [
+        {"trans_date": "2025-07-14", "amount": 54.99, "vendor": "AT&T"},
+        {
+            "trans_date": "2025-07-15",
+            "amount": 10,
+            "vendor": "Kroger",
+            "category_id": 1,
+        },
+        {"trans_date": "2025-07-16", "amount": 5, "vendor": "Shell", "category_id": 99},
+    ]
+    response = client.post("/transactions/bulk", json=payload)
+    data = response.json()
+
+    assert response.status_code == 201
+    assert data["inserted_count"] == 2
+    assert data["errors"] == [{"index": 2, "detail": "Category not found"}]
+
+    response = client.get("/transactions/")
+    data = response.json()
+    assert data["total_row_count"] == 2
+    assert data["data"][0]["category"]["name"] == "Utilities"
+
+
+def test_create_transactions_bulk_422(client: TestClient):
+    payload = [
+        {"trans_date": "2025-07-14", "amount": 54.99, "vendor": "AT&T"},
+        {"trans_date": "2025-07-15", "amount": 1.001, "vendor": "Kroger"},
+    ]
+    response = client.post("/transactions/bulk", json=payload)
+    data = response.json()
+
+    assert response.status_code == 422
+    assert data["detail"][0]["loc"][:2] == ["body", 1]
+
+
+def test_import_transactions(client: TestClient, add_category):
+    statement = (
+        "date,amount,vendor,note\n"
+        "2025-07-14,54.99,AT&T,Fiber Internet\n"
+        "2025-07-15,10.00,Kroger,\n"
+        "2025-07-16,1.001,Shell,\n"
+    )
+    response = client.post(
+        "/transactions/import?category_id=1&batch_size=1",
+        files={"file": ("statement.csv", statement, "text/csv")},
+    )
+    data = response.json()
+
+    assert response.status_code == 201
+    assert data["read_count"] == 3
+    assert data["inserted_count"] == 2
+    assert data["rejected_count"] == 1
+    assert data["rejected"][0]["record"] == 4
+
+    response = client.get("/transactions/")
+    data = response.json()
+    assert data["total_row_count"] == 2
+    assert data["data"][0]["category"]["name"] == "Utilities"
+
+
+def test_export_transactions_csv(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    response = client.get("/transactions/export?start_date=2025-01-01")
+    lines = response.text.splitlines()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert lines[0].startswith("id,trans_date,amount,vendor,note,category_id")
+    assert len(lines) == 2
+    assert lines[1].startswith("2,2025-11-02,84.99,Kroger,,,,")
+
+
+def test_export_transactions_ndjson(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    response = client.get("/transactions/export?format=ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == 200
+    assert len(records) == 2
+    assert records[0]["id"] == 1
+    assert records[0]["amount"] == "54.99"
+    assert records[0]["category_name"] == "Utilities"
+
+
+def test_export_transactions_parquet(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    response = client.get("/transactions/export?format=parquet")
+    table = pq.read_table(io.BytesIO(response.content))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert table.column_names[:4] == ["id", "trans_date", "amount", "vendor"]
+    assert table.column("amount").to_pylist() == [Decimal("54.99"), Decimal("84.99")]
+    assert table.column("category_name").to_pylist() == ["Utilities", None]
+    assert table.column("trans_date").type == pa.date32()
+
+
+def test_export_transactions_arrow(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    response = client.get("/transactions/export?format=arrow&start_date=2025-01-01")
+    table = pa.ipc.open_stream(response.content).read_all()
+
+    assert response.status_code == 200
+    assert table.num_rows == 1
+    assert table.column("vendor").to_pylist() == ["Kroger"]
+
+
+def test_export_transactions_arrow_empty(client: TestClient):
+    response = client.get("/transactions/export?format=arrow")
+    table = pa.ipc.open_stream(response.content).read_all()
+
+    assert table.num_rows == 0
+    assert table.column_names[0] == "id"
+
+
+@pytest.mark.parametrize("term,expected_count", [("at", 1), ("fiber", 1), ("t&t", 1)])
+def test_get_transactions_search_short_and_partial_terms(
+    client: TestClient, add_transaction, add_another_transaction, term, expected_count
+):
+    response = client.get(f"/transactions/?{generate_url_query({'q': term})}")
+    data = response.json()["data"]
+    assert response.status_code == 200
+    assert len(data) == expected_count
+
+
+def test_get_transactions_search_follows_updates(
+    client: TestClient, add_transaction, add_another_transaction
+):
+    client.patch("/transactions/2", json={"vendor": "Trader Joe's"})
+
+    response = client.get("/transactions/?q=kroger")
+    assert len(response.json()["data"]) == 0
+
+    response = client.get("/transactions/?q=joe")
+    assert len(response.json()["data"]) == 1
+
+
+def test_get_transactions_sort_by_relevance(client: TestClient, add_category):
+    transactions = [
+        {"trans_date": "2025-07-15", "amount": 10, "vendor": "Coffee Bar"},
+        {"trans_date": "2025-07-01", "amount": 10, "vendor": "Coffee Coffee"},
+        {"trans_date": "2025-07-20", "amount": 10, "vendor": "Kroger"},
+    ]
+    client.post("/transactions/bulk", json=transactions)
+
+    response = client.get("/transactions/?q=coffee&sort=relevance")
+    data = response.json()
+
+    assert response.status_code == 200
+    assert [row["vendor"] for row in data["data"]] == ["Coffee Coffee", "Coffee Bar"]
+    assert "sort=relevance" in data["links"]["current"]
+
+    response = client.get("/transactions/?q=coffee&sort=relevance&cursor=")
+    assert response.status_code == 400
+
+
+def test_delete_category_detaches_transactions(client: TestClient, add_transaction):
+    response = client.delete("/categories/1")
+    assert response.status_code == 200
+
+    response = client.get("/transactions/1")
+    assert response.status_code == 200
+    assert response.json()["category"] is None
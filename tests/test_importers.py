@@ -0,0 +1,119 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from src.api.importers import (
+    ImportOptions,
+    ImportResult,
+    StatementFormat,
+    read_ofx_records,
+    read_qif_records,
+    read_statement,
+)
+
+OFX_SGML = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20250714120000[-5:EST]
+<TRNAMT>-54.99
+<NAME>AT&amp;T
+<MEMO>Fiber Internet
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20250715
+<TRNAMT>-10.00
+<PAYEE>Kroger
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF = """!Type:Bank
+D07/14'25
+T-54.99
+PAT&T
+MFiber Internet
+^
+D7/15/2025
+T-10.00
+PKroger
+^
+"""
+
+
+def test_read_ofx_records():
+    records = list(read_ofx_records(io.StringIO(OFX_SGML)))
+
+    assert records == [
+        (
+            1,
+            {
+                "date": "20250714120000[-5:EST]",
+                "amount": "-54.99",
+                "vendor": "AT&T",
+                "note": "Fiber Internet",
+            },
+        ),
+        (2, {"date": "20250715", "amount": "-10.00", "vendor": "Kroger"}),
+    ]
+
+
+def test_read_ofx_records_across_chunks(monkeypatch):
+    monkeypatch.setattr("src.api.importers.OFX_CHUNK_SIZE", 7)
+    records = list(read_ofx_records(io.StringIO(OFX_SGML)))
+
+    assert [record["vendor"] for _, record in records] == ["AT&T", "Kroger"]
+
+
+def test_read_qif_records():
+    records = list(read_qif_records(io.StringIO(QIF)))
+
+    assert records[0] == (
+        1,
+        {
+            "date": "07/14'25",
+            "amount": "-54.99",
+            "vendor": "AT&T",
+            "note": "Fiber Internet",
+        },
+    )
+    assert records[1][1]["vendor"] == "Kroger"
+
+
+def test_read_statement_maps_and_rejects():
+    csv_text = (
+        "Posted,Description,Debit\n"
+        '07/14/2025,AT&T Fiber Internet Service Plan,"$1,054.99"\n'
+        "07/15/2025,Kroger,not-a-number\n"
+        "07/16/2025,,5.00\n"
+    )
+    options = ImportOptions(
+        format=StatementFormat.CSV,
+        date_column="Posted",
+        amount_column="Debit",
+        vendor_column="Description",
+        date_format="%m/%d/%Y",
+    )
+    result = ImportResult()
+    transactions = list(read_statement(io.StringIO(csv_text), options, result))
+
+    assert len(transactions) == 1
+    record_num, transaction = transactions[0]
+    assert record_num == 2
+    assert transaction.trans_date == date(2025, 7, 14)
+    assert transaction.amount == Decimal("1054.99")
+    assert transaction.vendor == "AT&T Fiber Internet Servi"
+
+    assert result.read_count == 3
+    assert result.rejected_count == 2
+    assert [r.record for r in result.rejected] == [3, 4]
+
+
+def test_read_statement_negate_amounts():
+    options = ImportOptions(format=StatementFormat.QIF, negate_amounts=True)
+    result = ImportResult()
+    transactions = list(read_statement(io.StringIO(QIF), options, result))
+
+    assert [t.amount for _, t in transactions] == [Decimal("54.99"), Decimal("10.00")]
+    assert transactions[0][1].trans_date == date(2025, 7, 14)
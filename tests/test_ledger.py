@@ -0,0 +1,181 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from src.api.ledger import (
+    ColumnarLedger,
+    get_ledger,
+    month_index,
+    transaction_ledger,
+)
+from src.api.models import Transaction
+
+
+def _ledger_rows(ledger: ColumnarLedger) -> list[tuple]:
+    columns = ledger.columns()
+    return list(
+        zip(
+            columns.id.tolist(),
+            columns.day.tolist(),
+            columns.amount_cents.tolist(),
+            columns.category_id.tolist(),
+            [ledger.vendors[code] for code in columns.vendor_code.tolist()],
+        )
+    )
+
+
+def test_ledger_follows_writes(client: TestClient, test_session):
+    client.post("/categories", json={"name": "Utilities"})
+    client.post("/categories", json={"name": "Travel"})
+    transaction_ledger.load(test_session)
+
+    for payload in [
+        {
+            "trans_date": "2025-07-14",
+            "amount": 50.99,
+            "vendor": "AT&T",
+            "category_id": 1,
+        },
+        {
+            "trans_date": "2025-07-01",
+            "amount": 15.00,
+            "vendor": "Expedia",
+            "category_id": 2,
+        },
+        {"trans_date": "2025-06-02", "amount": 25.00, "vendor": "Amazon"},
+    ]:
+        client.post("/transactions", json=payload)
+    client.patch("/transactions/1", json={"amount": 60.00, "vendor": "Verizon"})
+    client.delete("/transactions/2")
+    client.post(
+        "/transactions/bulk",
+        json=[
+            {"trans_date": "2025-07-02", "amount": 5.00, "vendor": "Kroger"},
+            {
+                "trans_date": "2025-07-03",
+                "amount": 7.50,
+                "vendor": "Kroger",
+                "category_id": 1,
+            },
+        ],
+    )
+    statement = "date,amount,vendor\n2025-09-01,12.00,Shell\n"
+    client.post(
+        "/transactions/import",
+        files={"file": ("statement.csv", io.BytesIO(statement.encode()))},
+    )
+    client.delete("/categories/1")
+    # a failed write leaves the ledger alone
+    response = client.post(
+        "/transactions",
+        json={
+            "trans_date": "2025-07-14",
+            "amount": 1.00,
+            "vendor": "X",
+            "category_id": 9,
+        },
+    )
+    assert response.status_code == 404
+
+    reloaded = ColumnarLedger(ttl=60)
+    reloaded.load(test_session)
+
+    assert _ledger_rows(transaction_ledger) == _ledger_rows(reloaded)
+    assert len(reloaded.columns().id) == 5
+    assert reloaded.columns().category_id.tolist() == [-1] * 5
+
+
+def test_category_stats_from_ledger(client: TestClient, test_session):
+    for payload in [
+        {"trans_date": "2025-06-30", "amount": 10.00, "vendor": "Amazon"},
+        {"trans_date": "2025-07-01", "amount": 20.00, "vendor": "Amazon"},
+        {"trans_date": "2025-07-31", "amount": 40.00, "vendor": "Amazon"},
+    ]:
+        client.post("/transactions", json=payload)
+
+    url = "/reports/category_stats?start_date=2025-06-15&end_date=2025-07-15"
+    from_database = client.get(url).json()
+    transaction_ledger.load(test_session)
+    from_ledger = client.get(url).json()
+
+    assert from_ledger == from_database
+    assert from_ledger[0]["count"] == 2
+    assert from_ledger[0]["month_over_month_growth"] == 1.0
+
+
+def test_ledger_upsert_and_delete():
+    ledger = ColumnarLedger(ttl=60)
+    row = {
+        "trans_date": date(2025, 7, 1),
+        "amount": Decimal("1.25"),
+        "category_id": None,
+    }
+
+    ledger.upsert([dict(row, id=2, vendor="B"), dict(row, id=1, vendor="A")])
+    ledger.upsert([dict(row, id=2, vendor="C", amount=Decimal("3.00"))])
+    ledger.delete([1, 7])
+    # SQLite reuses the id of the last row once it is deleted
+    ledger.upsert([dict(row, id=1, vendor="A")])
+
+    assert _ledger_rows(ledger) == [
+        (1, 20270, 125, -1, "A"),
+        (2, 20270, 300, -1, "C"),
+    ]
+    assert month_index(ledger.columns().day).tolist() == [2025 * 12 + 6] * 2
+
+
+def test_ledger_follows_async_writes(async_client: TestClient, test_session):
+    transaction_ledger.load(test_session)
+
+    async_client.post(
+        "/transactions",
+        json={"trans_date": "2025-07-14", "amount": 9.99, "vendor": "AT&T"},
+    )
+
+    assert _ledger_rows(transaction_ledger) == [(1, 20283, 999, -1, "AT&T")]
+
+
+def test_ledger_reload_keeps_changes_committed_meanwhile(
+    client: TestClient, test_session, monkeypatch
+):
+    client.post(
+        "/transactions",
+        json={"trans_date": "2025-07-14", "amount": 9.99, "vendor": "AT&T"},
+    )
+    ledger = ColumnarLedger(ttl=0)
+    fill = ColumnarLedger._fill
+
+    def fill_then_write(fresh, session):
+        fill(fresh, session)
+        # committed after the reload read the table, before the swap
+        ledger.apply(lambda ledger: ledger.delete([1]))
+
+    monkeypatch.setattr(ColumnarLedger, "_fill", fill_then_write)
+    ledger.load(test_session)
+
+    assert _ledger_rows(ledger) == []
+
+
+def test_ledger_reloads_in_the_background(test_session, monkeypatch):
+    transaction_ledger.load(test_session)
+    # written by another process, so only a reload picks it up
+    test_session.execute(
+        insert(Transaction).values(
+            trans_date=date(2025, 7, 14), amount=Decimal("9.99"), vendor="AT&T"
+        )
+    )
+    test_session.commit()
+    monkeypatch.setattr(transaction_ledger, "ttl", 0)
+
+    # another thread is reloading; this one serves what it has
+    with transaction_ledger._reload_lock:
+        assert get_ledger() is transaction_ledger
+    assert _ledger_rows(transaction_ledger) == []
+
+    assert get_ledger() is transaction_ledger
+    # the lock is held until the background reload has swapped in its arrays
+    with transaction_ledger._reload_lock:
+        assert _ledger_rows(transaction_ledger) == [(1, 20283, 999, -1, "AT&T")]
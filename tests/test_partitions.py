@@ -0,0 +1,60 @@
+from datetime import date, datetime
+
+from fastapi.testclient import TestClient
+
+from src.api import partitions
+from src.api.partitions import (
+    create_partition_sql,
+    ensure_future_partitions,
+    ensure_partitions,
+    partition_name,
+)
+
+
+def test_partition_bounds_cover_one_month():
+    assert partition_name(date(2025, 7, 14)) == "transaction_y2025m07"
+    assert create_partition_sql(date(2025, 12, 31)) == (
+        'CREATE TABLE IF NOT EXISTS transaction_y2025m12 PARTITION OF "transaction" '
+        "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')"
+    )
+
+
+def test_unpartitioned_database_is_left_alone(client: TestClient, test_session):
+    # SQLite has no partitioning, so writes never create tables
+    assert ensure_partitions(test_session, [date(2031, 1, 1)]) == []
+    assert ensure_future_partitions(test_session) == []
+
+    response = client.post(
+        "/transactions",
+        json={"trans_date": "2031-01-05", "amount": 12.5, "vendor": "Kroger"},
+    )
+    assert response.status_code == 201
+
+
+def test_registry_rereads_catalog_after_ttl(test_session, monkeypatch):
+    catalog_reads = []
+
+    def read_catalog(session):
+        catalog_reads.append(session)
+        return {date(2025, 7, 1)}
+
+    monkeypatch.setattr(partitions, "partition_months", read_catalog)
+    registry = partitions.PartitionRegistry(ttl=60)
+    registry.ensure(test_session, [date(2025, 7, 14)])
+    registry.ensure(test_session, [date(2025, 7, 20)])
+    assert len(catalog_reads) == 1
+
+    # another process may have dropped a partition this one still knows
+    registry.ttl = 0
+    registry.ensure(test_session, [date(2025, 7, 14)])
+    assert len(catalog_reads) == 2
+
+
+def test_registry_matches_datetimes_to_known_months(test_session, monkeypatch):
+    monkeypatch.setattr(
+        partitions, "partition_months", lambda session: {date(2025, 7, 1)}
+    )
+    registry = partitions.PartitionRegistry(ttl=60)
+
+    # a PATCH carries a datetime; it must not look like a new month
+    assert registry.ensure(test_session, [datetime(2025, 7, 14, 9, 30)]) == []
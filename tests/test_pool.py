@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import exc
+from sqlmodel import create_engine
+
+from src.api.pool import TimedQueuePool, get_pool_status
+
+
+@pytest.fixture()
+def pooled_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+    yield engine
+
+    engine.dispose()
+
+
+def test_pool_status_counts_checkouts(pooled_engine):
+    with pooled_engine.connect():
+        status = get_pool_status("sync", pooled_engine.pool)
+        assert status.pool_class == "TimedQueuePool"
+        assert status.size == 1
+        assert status.checked_out == 1
+        assert status.checkouts == 1
+
+    status = get_pool_status("sync", pooled_engine.pool)
+    assert status.checked_out == 0
+    assert status.checked_in == 1
+    assert status.timeouts == 0
+
+
+def test_pool_status_records_timeouts(pooled_engine):
+    with pooled_engine.connect(), pytest.raises(exc.TimeoutError):
+        pooled_engine.connect()
+
+    status = get_pool_status("sync", pooled_engine.pool)
+    assert status.checkouts == 2
+    assert status.timeouts == 1
+    assert status.wait_ms_max >= 50
@@ -0,0 +1,11 @@
+import pytest
+
+from src.api.query_plans import check_query_plans, get_plan_checks
+
+
+@pytest.mark.parametrize("name", [check.name for check in get_plan_checks("sqlite")])
+def test_query_plan_uses_index(test_session, name):
+    results = {result.name: result for result in check_query_plans(test_session)}
+    result = results[name]
+
+    assert result.passed, f"'{name}' did not use its index:\n{result.plan}"
@@ -0,0 +1,147 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.api import dependencies
+from src.api.dependencies import (
+    READ_YOUR_WRITES_COOKIE,
+    Session,
+    create_engine,
+    get_async_url,
+    get_db,
+    get_read_db,
+    get_session,
+)
+from src.api.main import app
+from src.api.models import SQLModel
+
+
+@pytest.fixture()
+def replica_client(db_engine, tmp_path, monkeypatch):
+    """Client whose reads go to a second database that never receives the writes."""
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    SQLModel.metadata.create_all(replica_engine)
+    monkeypatch.setattr(dependencies, "engine", db_engine)
+    monkeypatch.setattr(dependencies, "replica_engine", replica_engine)
+
+    def get_primary_session():
+        with Session(db_engine) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_primary_session
+
+    yield TestClient(app)
+
+    app.dependency_overrides.clear()
+    replica_engine.dispose()
+
+
+def test_reads_follow_writes_then_go_to_replica(replica_client: TestClient):
+    response = replica_client.post(
+        "/transactions",
+        json={"trans_date": "2025-07-14", "amount": 9.99, "vendor": "AT&T"},
+    )
+
+    assert READ_YOUR_WRITES_COOKIE in response.cookies
+
+    # the writer reads its own write from the primary
+    assert len(replica_client.get("/transactions/").json()["data"]) == 1
+
+    # once the window has passed, listings and reports read the lagging replica
+    replica_client.cookies.clear()
+    assert replica_client.get("/transactions/").json()["data"] == []
+    assert replica_client.get("/reports/monthly_budget?year_month=2025-07").json() == []
+
+    # single rows are always read from the primary
+    assert replica_client.get("/transactions/1").status_code == 200
+
+
+def test_replica_totals_stay_out_of_the_count_cache(replica_client: TestClient):
+    replica_client.post(
+        "/transactions",
+        json={"trans_date": "2025-07-14", "amount": 9.99, "vendor": "AT&T"},
+    )
+    pinned_cookies = dict(replica_client.cookies)
+
+    # another client lists from the lagging replica first
+    replica_client.cookies.clear()
+    assert replica_client.get("/transactions/").json()["total_row_count"] == 0
+
+    # the writer, still pinned to the primary, gets the primary's total
+    replica_client.cookies.update(pinned_cookies)
+    page = replica_client.get("/transactions/").json()
+    assert page["total_row_count"] == 1
+    assert len(page["data"]) == 1
+
+
+def test_categories_cache_loads_from_primary(replica_client: TestClient):
+    replica_client.post("/categories", json={"name": "Utilities"})
+    replica_client.cookies.clear()
+
+    data = replica_client.get("/categories/").json()
+
+    assert [category["name"] for category in data] == ["Utilities"]
+
+
+@pytest.fixture()
+def async_replica_client(db_engine, tmp_path, monkeypatch):
+    """`replica_client`, with routes running on async engines."""
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    SQLModel.metadata.create_all(replica_engine)
+    async_engine, async_replica_engine = (
+        create_async_engine(get_async_url(str(bind.url)), poolclass=NullPool)
+        for bind in (db_engine, replica_engine)
+    )
+    monkeypatch.setattr(dependencies, "engine", db_engine)
+    monkeypatch.setattr(dependencies, "replica_engine", replica_engine)
+    monkeypatch.setattr(dependencies, "async_engine", async_engine)
+    monkeypatch.setattr(dependencies, "async_replica_engine", async_replica_engine)
+
+    async def get_primary_db():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    async def get_replica_db():
+        async with AsyncSession(
+            async_replica_engine, expire_on_commit=False
+        ) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = get_primary_db
+    app.dependency_overrides[get_read_db] = get_replica_db
+
+    yield TestClient(app)
+
+    app.dependency_overrides.clear()
+    replica_engine.dispose()
+
+
+def test_async_categories_cache_loads_from_async_primary(
+    async_replica_client: TestClient, db_engine
+):
+    async_replica_client.post("/categories", json={"name": "Utilities"})
+    async_replica_client.cookies.clear()
+
+    # the sync primary engine would block the event loop
+    sync_statements = []
+    event.listen(
+        db_engine,
+        "before_cursor_execute",
+        lambda *args: sync_statements.append(args[2]),
+    )
+    data = async_replica_client.get("/categories/").json()
+
+    assert [category["name"] for category in data] == ["Utilities"]
+    assert sync_statements == []
+
+
+def test_no_cookie_without_replica(client: TestClient):
+    response = client.post(
+        "/transactions",
+        json={"trans_date": "2025-07-14", "amount": 9.99, "vendor": "AT&T"},
+    )
+
+    assert READ_YOUR_WRITES_COOKIE not in response.cookies
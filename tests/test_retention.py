@@ -0,0 +1,114 @@
+from datetime import date
+
+import pyarrow.parquet as pq
+from fastapi.testclient import TestClient
+from sqlmodel import func, select
+
+from src.api.ledger import ColumnarLedger, transaction_ledger
+from src.api.models import CompactedMonth, Transaction
+from src.api.retention import (
+    _purge_rows,
+    archive_month,
+    compact_transactions,
+    retention_cutoff,
+)
+from src.api.rollup import rebuild_monthly_spend
+
+
+def test_retention_cutoff_keeps_whole_months():
+    assert retention_cutoff(date(2026, 10, 18), years=7) == date(2019, 10, 1)
+
+
+def test_compaction_archives_purges_and_keeps_report_totals(
+    client: TestClient, test_session, tmp_path
+):
+    category_id = client.post("/categories", json={"name": "Groceries"}).json()["id"]
+    for trans_date, amount in [
+        ("2018-03-02", 20.25),
+        ("2018-03-20", 4.75),
+        ("2018-04-09", 10.00),
+        ("2025-07-14", 50.99),
+    ]:
+        client.post(
+            "/transactions",
+            json={
+                "trans_date": trans_date,
+                "amount": amount,
+                "vendor": "Kroger",
+                "category_id": category_id,
+            },
+        )
+
+    # updated before the archive, so purged along with the rest
+    client.patch("/transactions/1", json={"note": "weekly shop"})
+
+    results = compact_transactions(
+        test_session, date(2019, 1, 1), tmp_path, batch_size=1
+    )
+
+    assert [(r.month, r.archived_count, r.purged_count) for r in results] == [
+        (date(2018, 3, 1), 2, 2),
+        (date(2018, 4, 1), 1, 1),
+    ]
+    archived = pq.read_table(results[0].archive_path)
+    assert sorted(archived.column("vendor").to_pylist()) == ["Kroger", "Kroger"]
+    assert test_session.exec(select(func.count()).select_from(Transaction)).one() == 1
+    assert test_session.get(CompactedMonth, date(2018, 3, 1)).transaction_count == 2
+
+    # a full rollup rebuild must not erase the totals of compacted months
+    rebuild_monthly_spend(test_session)
+    test_session.commit()
+
+    response = client.get("/reports/monthly_budget", params={"year_month": "2018-03"})
+    assert response.json()[0]["amount_spent"] == "25.00"
+
+    response = client.get(
+        "/reports/budget_trend", params={"start": "2018-03", "end": "2018-04"}
+    )
+    months = response.json()["categories"][0]["months"]
+    assert [month["amount_spent"] for month in months] == ["25.00", "10.00"]
+
+
+def test_purge_spares_rows_written_after_the_archive(
+    client: TestClient, test_session, tmp_path
+):
+    for trans_date in ("2018-03-02", "2018-03-20"):
+        client.post(
+            "/transactions",
+            json={"trans_date": trans_date, "amount": 5, "vendor": "Kroger"},
+        )
+    _, versions = archive_month(test_session, date(2018, 3, 1), tmp_path)
+
+    # written after the snapshot: one new row, one changed row
+    client.post(
+        "/transactions",
+        json={"trans_date": "2018-03-25", "amount": 7, "vendor": "Aldi"},
+    )
+    client.patch("/transactions/2", json={"amount": 6})
+
+    assert _purge_rows(test_session, versions, batch_size=10) == 1
+    remaining = test_session.exec(select(Transaction.id).order_by(Transaction.id))
+    assert remaining.all() == [2, 3]
+
+
+def test_purge_batches_survive_a_ledger_reload(
+    client: TestClient, test_session, tmp_path, monkeypatch
+):
+    for trans_date in ("2018-03-02", "2018-03-09", "2018-03-20"):
+        client.post(
+            "/transactions",
+            json={"trans_date": trans_date, "amount": 5, "vendor": "Kroger"},
+        )
+    _, versions = archive_month(test_session, date(2018, 3, 1), tmp_path)
+    transaction_ledger.load(test_session)
+    fill = ColumnarLedger._fill
+
+    def fill_then_purge(fresh, session):
+        fill(fresh, session)
+        # purged after the reload read the table, so each batch is replayed
+        _purge_rows(session, versions, batch_size=1)
+
+    monkeypatch.setattr(ColumnarLedger, "_fill", fill_then_purge)
+    transaction_ledger.load(test_session)
+
+    assert len(transaction_ledger.columns().id) == 0
@@ -0,0 +1,131 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import select
+
+from src.api.models import Category, MonthlySpend
+from src.api.rollup import apply_spend_deltas, rebuild_monthly_spend
+
+
+def _rollup(session) -> list[tuple]:
+    rows = session.exec(
+        select(
+            MonthlySpend.month,
+            MonthlySpend.category_id,
+            MonthlySpend.amount_spent,
+            MonthlySpend.transaction_count,
+        ).where(MonthlySpend.transaction_count > 0)
+    ).all()
+    return sorted(rows, key=lambda row: (row[0], row[1] or 0))
+
+
+def test_rollup_maintained_by_writes(client: TestClient, test_session):
+    client.post("/categories", json={"name": "Utilities"})
+    client.post("/categories", json={"name": "Travel"})
+
+    for payload in [
+        {
+            "trans_date": "2025-07-14",
+            "amount": 50.99,
+            "vendor": "AT&T",
+            "category_id": 1,
+        },
+        {
+            "trans_date": "2025-07-31",
+            "amount": 0.01,
+            "vendor": "AT&T",
+            "category_id": 1,
+        },
+        {
+            "trans_date": "2025-07-01",
+            "amount": 15.00,
+            "vendor": "Expedia",
+            "category_id": 2,
+        },
+        {"trans_date": "2025-06-02", "amount": 25.00, "vendor": "Amazon"},
+    ]:
+        client.post("/transactions", json=payload)
+
+    client.patch("/transactions/1", json={"amount": 60.00})
+    client.patch("/transactions/2", json={"trans_date": "2025-08-01"})
+    client.patch("/transactions/4", json={"category_id": 2})
+    client.patch("/transactions/4", json={"note": "Luggage"})
+    client.delete("/transactions/3")
+
+    client.post(
+        "/transactions/bulk",
+        json=[
+            {"trans_date": "2025-07-02", "amount": 5.00, "vendor": "Kroger"},
+            {"trans_date": "2025-07-03", "amount": 7.50, "vendor": "Kroger"},
+        ],
+    )
+    statement = "date,amount,vendor\n2025-09-01,12.00,Shell\n"
+    client.post(
+        "/transactions/import",
+        files={"file": ("statement.csv", io.BytesIO(statement.encode()))},
+    )
+    client.delete("/categories/1")
+
+    maintained = _rollup(test_session)
+
+    rebuild_monthly_spend(test_session)
+    test_session.commit()
+
+    assert maintained == _rollup(test_session)
+    assert len(maintained) == 4
+
+
+def test_monthly_report_reads_rollup(client: TestClient, test_session):
+    client.post(
+        "/transactions",
+        json={"trans_date": "2025-07-14", "amount": 9.99, "vendor": "AT&T"},
+    )
+
+    # the report never scans transactions, so only the rollup decides the total
+    rollup_row = test_session.exec(select(MonthlySpend)).one()
+    rollup_row.amount_spent = 100
+    test_session.add(rollup_row)
+    test_session.commit()
+
+    response = client.get("/reports/monthly_budget?year_month=2025-07")
+
+    assert response.json()[0]["amount_spent"] == "100.00"
+
+
+def test_apply_spend_deltas_in_index_order(test_session):
+    groceries, rent = Category(name="Groceries"), Category(name="Rent")
+    test_session.add_all([groceries, rent])
+    test_session.commit()
+
+    statements = []
+    engine = test_session.get_bind()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "monthly_spend" in statement:
+            statements.append(parameters)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        apply_spend_deltas(
+            test_session,
+            {
+                (date(2025, 2, 1), groceries.id): (Decimal("5.00"), 1),
+                (date(2025, 1, 1), rent.id): (Decimal("7.00"), 1),
+                (date(2025, 1, 1), None): (Decimal("3.00"), 1),
+                (date(2025, 1, 1), groceries.id): (Decimal(0), 0),
+            },
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    # one row per key, each as (month, category_id, amount_spent, transaction_count)
+    (parameters,) = statements
+    rows = [parameters[i : i + 4] for i in range(0, len(parameters), 4)]
+    assert [(row[0], row[1]) for row in rows] == [
+        ("2025-01-01", None),
+        ("2025-01-01", rent.id),
+        ("2025-02-01", groceries.id),
+    ]